@@ -4,7 +4,7 @@
 import sqlite3
 import os
 
-def check_table_schema():
+def check_table_schema(filename="IMG_20250819_094620.jpg"):
     """检查photos表的确切结构"""
     db_path = "myphotolib/.library.db"
     
@@ -24,8 +24,8 @@ def check_table_schema():
         for col in columns:
             print(f"  - {col[1]} ({col[2]}) {'[主键]' if col[5] else ''} {'[非空]' if col[3] else ''}")
         
-        # 查询特定照片
-        cursor.execute("SELECT * FROM photos WHERE filename LIKE ?", ("%IMG_20250819_094620.jpg%",))
+        # 查询特定照片：按文件名精确匹配，可使用 idx_photos_filename 索引，找到一条即停止
+        cursor.execute("SELECT * FROM photos WHERE filename = ? LIMIT 1", (filename,))
         result = cursor.fetchone()
         
         if result:
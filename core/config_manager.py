@@ -6,8 +6,38 @@
 """
 
 import os
-import json
-from typing import Any, Dict, Optional
+import atexit
+import threading
+import weakref
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from libs import fast_json
+
+
+# 配置修改后延迟写盘的时间（秒），期间的多次修改合并为一次写入
+CONFIG_FLUSH_DELAY = 1.0
+
+# get() 中表示键不存在的哨兵值
+_MISSING = object()
+
+# 仍存活的配置管理器，退出时保存其中未写盘的修改；弱引用，不延长实例的生命周期
+_live_managers: 'weakref.WeakSet[ConfigManager]' = weakref.WeakSet()
+
+
+def _flush_live_managers() -> None:
+    """解释器退出时保存所有仍存活的配置管理器中未写盘的修改"""
+    for manager in list(_live_managers):
+        manager.flush()
+
+
+atexit.register(_flush_live_managers)
+
+
+@lru_cache(maxsize=256)
+def _split_key(key: str) -> Tuple[str, ...]:
+    """拆分点分隔的配置键，结果按键缓存"""
+    return tuple(key.split('.'))
 
 
 class ConfigManager:
@@ -23,20 +53,29 @@ class ConfigManager:
         self.config_file = config_file
         self.config_path = os.path.join(os.getcwd(), config_file)
         self._config: Dict[str, Any] = {}
+        
+        # 延迟写盘状态：_dirty 表示内存中的配置尚未保存
+        self._dirty = False
+        self._flush_timer: Optional[threading.Timer] = None
+        self._lock = threading.RLock()
+        
         self._load_config()
+        
+        # 退出时保证未保存的修改落盘（由模块级的退出钩子统一处理）
+        _live_managers.add(self)
     
     def _load_config(self) -> None:
         """从文件加载配置"""
         try:
             if os.path.exists(self.config_path):
                 with open(self.config_path, 'r', encoding='utf-8') as f:
-                    self._config = json.load(f)
+                    self._config = fast_json.loads(f.read())
                 print(f"配置文件已加载: {self.config_path}")
             else:
                 # 如果配置文件不存在，创建默认配置
                 self._create_default_config()
                 print(f"创建默认配置文件: {self.config_path}")
-        except (json.JSONDecodeError, IOError) as e:
+        except (fast_json.JSONDecodeError, IOError) as e:
             print(f"加载配置文件失败: {e}")
             self._create_default_config()
     
@@ -82,15 +121,16 @@ class ConfigManager:
         Returns:
             配置值
         """
-        keys = key.split('.')
         value = self._config
         
-        try:
-            for k in keys:
-                value = value[k]
-            return value
-        except (KeyError, TypeError):
-            return default
+        for k in _split_key(key):
+            if not isinstance(value, dict):
+                return default
+            value = value.get(k, _MISSING)
+            if value is _MISSING:
+                return default
+        
+        return value
     
     def set(self, key: str, value: Any) -> None:
         """
@@ -100,32 +140,75 @@ class ConfigManager:
             key: 配置键，支持点分隔的嵌套键
             value: 配置值
         """
-        keys = key.split('.')
-        config = self._config
-        
-        # 导航到最后一级的父级
-        for k in keys[:-1]:
-            if k not in config:
-                config[k] = {}
-            config = config[k]
+        keys = _split_key(key)
         
-        # 设置值
-        config[keys[-1]] = value
+        with self._lock:
+            config = self._config
+            
+            # 导航到最后一级的父级
+            for k in keys[:-1]:
+                config = config.setdefault(k, {})
+            
+            # 设置值
+            config[keys[-1]] = value
+            self._dirty = True
     
     def save_config(self) -> bool:
         """
         保存配置到文件
+        先写入临时文件再替换原文件，避免写入中断导致配置文件损坏
         
         Returns:
             是否保存成功
         """
-        try:
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(self._config, f, indent=2, ensure_ascii=False)
-            return True
-        except IOError as e:
-            print(f"保存配置文件失败: {e}")
-            return False
+        tmp_path = self.config_path + ".tmp"
+        
+        with self._lock:
+            if self._flush_timer:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(fast_json.dumps(self._config, indent=True))
+                os.replace(tmp_path, self.config_path)
+                self._dirty = False
+                return True
+            except IOError as e:
+                print(f"保存配置文件失败: {e}")
+                return False
+    
+    def flush(self) -> bool:
+        """
+        立即保存尚未写盘的配置修改
+        
+        Returns:
+            是否保存成功（没有待保存的修改时返回True）
+        """
+        with self._lock:
+            if not self._dirty:
+                return True
+            return self.save_config()
+    
+    def close(self) -> bool:
+        """
+        保存未写盘的修改，并不再在退出时处理本实例
+        
+        Returns:
+            是否保存成功
+        """
+        _live_managers.discard(self)
+        return self.flush()
+    
+    def _schedule_flush(self) -> None:
+        """安排延迟保存，在CONFIG_FLUSH_DELAY秒内的多次修改只写盘一次"""
+        with self._lock:
+            if self._flush_timer:
+                self._flush_timer.cancel()
+            
+            self._flush_timer = threading.Timer(CONFIG_FLUSH_DELAY, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
     
     def get_photo_library_path(self) -> str:
         """获取当前照片库路径"""
@@ -151,7 +234,7 @@ class ConfigManager:
         recent_paths = recent_paths[:5]
         self.set('photo_library.recent_paths', recent_paths)
         
-        self.save_config()
+        self._schedule_flush()
     
     def get_database_path(self) -> str:
         """
@@ -182,8 +265,8 @@ class ConfigManager:
         """设置窗口大小"""
         self.set('ui.window_width', width)
         self.set('ui.window_height', height)
-        self.save_config()
+        self._schedule_flush()
     
     def __str__(self) -> str:
         """返回配置的字符串表示"""
-        return json.dumps(self._config, indent=2, ensure_ascii=False)
\ No newline at end of file
+        return fast_json.dumps(self._config, indent=True)
\ No newline at end of file
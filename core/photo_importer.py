@@ -11,27 +11,119 @@
 """
 
 import os
+import mmap
 import shutil
 import hashlib
 import datetime
-from pathlib import Path
-from typing import List, Tuple, Optional, Dict, Any
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from typing import List, Tuple, Optional, Dict, Any, TYPE_CHECKING
 import logging
 
-# 图像处理和EXIF读取
-try:
-    from PIL import Image
-    from PIL.ExifTags import TAGS
-    import exifread
-except ImportError as e:
-    print(f"警告：缺少必要的依赖库 {e}")
-    print("请运行：pip install Pillow exifread")
+# PIL、exifread和QtWidgets较重，在实际用到时才导入，
+# 使只需要PhotoImportWorker的场景（命令行批量导入等）不必加载它们
+from PyQt6.QtCore import QThread, QEventLoop, pyqtSignal, QObject
 
-from PyQt6.QtWidgets import QFileDialog, QProgressDialog, QMessageBox, QApplication
-from PyQt6.QtCore import QThread, pyqtSignal, QObject
+if TYPE_CHECKING:
+    from PyQt6.QtWidgets import QProgressDialog
 
 # 导入数据库模块
-from db.database import DatabaseManager
+from db.database_manager import DatabaseManager
+
+
+# 支持导入的图片扩展名（小写，含点号）
+SUPPORTED_IMAGE_EXTENSIONS = frozenset({
+    '.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.tif',
+    '.webp', '.raw', '.cr2', '.nef', '.arw', '.dng'
+})
+
+# 扫描导入目录时跳过的目录：NAS/系统生成的缩略图缓存和回收站等
+# （以点号开头的隐藏目录如 .git、.Trash 也会被跳过）
+SKIPPED_SCAN_DIRS = frozenset({
+    '@eaDir', 'thumbnails', 'Thumbs', '$RECYCLE.BIN', 'System Volume Information'
+})
+
+# EXIF时间字段，按优先级排列：原始拍摄时间 > 修改时间 > 数字化时间
+EXIF_TIME_TAG_NAMES = ('DateTimeOriginal', 'DateTime', 'DateTimeDigitized')
+
+# exifread中的时间标签键，按优先级排列
+EXIFREAD_TIME_TAGS = (
+    'EXIF DateTimeOriginal',
+    'Image DateTime',
+    'EXIF DateTimeDigitized'
+)
+
+# 小于该阈值的文件直接一次性读入内存计算哈希，避免mmap的额外开销
+MMAP_HASH_THRESHOLD = 256 * 1024
+
+# 并行执行哈希、EXIF读取和复制的最大线程数
+IMPORT_MAX_WORKERS = 8
+
+# 累积多少条记录后在一个事务中批量写入数据库
+IMPORT_BATCH_SIZE = 500
+
+# 本次导入的文件数不少于此值、且多于库中已有照片数时，导入期间删除二级索引，完成后一次性重建
+BULK_IMPORT_MIN_FILES = 5000
+
+# 进度百分比不变时，两次进度信号之间的最小间隔（秒）
+PROGRESS_EMIT_INTERVAL = 0.1
+
+# 照片库根目录下的数据库文件名，与 ConfigManager.get_database_path 一致
+LIBRARY_DB_FILENAME = '.library.db'
+
+
+@lru_cache(maxsize=None)
+def _exif_time_tag_ids() -> Tuple[int, ...]:
+    """
+    EXIF时间字段对应的Pillow标签ID（首次调用时计算）
+    避免每个文件都遍历整个EXIF字典并反查TAGS
+    """
+    from PIL.ExifTags import TAGS
+    
+    return tuple(
+        tag_id
+        for name in EXIF_TIME_TAG_NAMES
+        for tag_id, tag_name in TAGS.items()
+        if tag_name == name
+    )
+
+
+def _parse_exif_datetime(value: Any) -> Optional[datetime.datetime]:
+    """
+    解析EXIF时间字符串（固定宽度格式 YYYY:MM:DD HH:MM:SS）
+    直接按位置切片转换，比strptime快一个数量级；格式不符或日期无效时返回None
+    """
+    try:
+        return datetime.datetime(
+            int(value[0:4]), int(value[5:7]), int(value[8:10]),
+            int(value[11:13]), int(value[14:16]), int(value[17:19])
+        )
+    except (TypeError, ValueError):
+        return None
+
+
+def _fast_copy(source_path: str, target_path: str) -> None:
+    """
+    复制文件内容并保留访问/修改时间
+    优先使用os.copy_file_range在内核中完成复制（Btrfs/XFS等写时复制文件系统上直接共享数据块），
+    不可用时回退到shutil.copyfile；不像shutil.copy2那样额外复制权限、扩展属性等元数据
+    """
+    source_stat = os.stat(source_path)
+    
+    try:
+        with open(source_path, 'rb') as src, open(target_path, 'wb') as dst:
+            remaining = source_stat.st_size
+            while remaining > 0:
+                copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                if copied == 0:
+                    raise OSError("copy_file_range 提前结束")
+                remaining -= copied
+    except (AttributeError, OSError):
+        shutil.copyfile(source_path, target_path)
+    
+    os.utime(target_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
 
 
 class PhotoImportWorker(QThread):
@@ -42,13 +134,40 @@ class PhotoImportWorker(QThread):
     import_completed = pyqtSignal(dict)      # 导入结果统计
     error_occurred = pyqtSignal(str)         # 错误信息
     
-    def __init__(self, files_to_import: List[str], target_library_path: str):
+    def __init__(self, files_to_import: List[str], target_library_path: str,
+                 db_manager: Optional[DatabaseManager] = None):
         super().__init__()
         self.files_to_import = files_to_import
         self.target_library_path = target_library_path
-        self.db_manager = DatabaseManager()
+        
+        # 优先复用调用方已打开的数据库连接，避免每次导入重新建立连接；
+        # 未传入时使用照片库根目录下的数据库
+        if db_manager is None:
+            db_manager = DatabaseManager(os.path.join(target_library_path, LIBRARY_DB_FILENAME))
+            db_manager.initialize()
+        self.db_manager = db_manager
         self.should_stop = False
         
+        # 并行复制时保护目标文件名的分配
+        self._copy_lock = threading.Lock()
+        
+        # 本次导入中已确认存在的日期目录
+        self._created_dirs = set()
+        
+        # 已列出的目标目录中的文件名：目录路径 -> 文件名集合（受 _copy_lock 保护）
+        self._dir_contents: Dict[str, set] = {}
+        
+        # 数据库连接在多个线程间共享，所有访问需串行化
+        self._db_lock = threading.Lock()
+        
+        # 库中已有及本次已排队写入的 (大小, MD5) 和文件大小，导入开始时一次性加载，
+        # 之后的去重判断都在内存中完成
+        self._existing_keys = set()
+        self._existing_sizes = set()
+        
+        # 等待批量写入数据库的记录：(源文件路径, 复制后的文件路径, 照片信息)
+        self._pending_records = []
+        
         # 导入统计
         self.stats = {
             'total': 0,
@@ -63,54 +182,118 @@ class PhotoImportWorker(QThread):
         self.should_stop = True
     
     def run(self):
-        """执行导入任务"""
+        """
+        执行导入任务
+        哈希、EXIF读取和文件复制在线程池中并行执行，数据库写入只在本线程中串行进行
+        """
         try:
             self.stats['total'] = len(self.files_to_import)
             
-            for i, file_path in enumerate(self.files_to_import):
-                if self.should_stop:
-                    break
+            with self._db_lock:
+                self._existing_keys = self.db_manager.get_existing_photo_keys()
+            self._existing_sizes = {size for size, _ in self._existing_keys}
+            
+            # 首次导入大量照片时，逐行维护所有索引比导入后重建更慢；
+            # 向已有的大库中追加少量照片时则保留索引
+            bulk_import = (
+                self.stats['total'] >= BULK_IMPORT_MIN_FILES
+                and self.stats['total'] > len(self._existing_keys)
+            )
+            if bulk_import:
+                with self._db_lock:
+                    bulk_import = self.db_manager.begin_bulk_import()
+            
+            try:
+                self._import_files()
+            finally:
+                if bulk_import:
+                    with self._db_lock:
+                        self.db_manager.end_bulk_import()
+            
+            # 完成导入
+            self.progress_updated.emit(100, "导入完成")
+            self.import_completed.emit(self.stats)
+            
+        except Exception as e:
+            self.error_occurred.emit(f"导入过程中发生错误: {str(e)}")
+    
+    def _import_files(self):
+        """在线程池中准备所有文件，并在本线程中批量写入数据库"""
+        max_workers = min(IMPORT_MAX_WORKERS, os.cpu_count() or 1)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._prepare_file, file_path): file_path
+                for file_path in self.files_to_import
+            }
+            
+            cancelled = False
+            done_count = 0
+            last_progress = -1
+            last_emit_time = 0.0
+            
+            for future in as_completed(futures):
+                # 停止时取消尚未开始的任务，已完成复制的文件仍然写入数据库
+                if self.should_stop and not cancelled:
+                    for pending in futures:
+                        pending.cancel()
+                    cancelled = True
+                
+                if future.cancelled():
+                    continue
                 
-                # 更新进度
-                progress = int((i / self.stats['total']) * 100)
-                self.progress_updated.emit(progress, os.path.basename(file_path))
+                file_path = futures[future]
+                done_count += 1
                 
-                # 导入单个文件
-                result = self._import_single_file(file_path)
+                # 更新进度：只在百分比变化或距上次发送超过间隔时发送，
+                # 避免大批量导入时跨线程信号堆积在界面线程的事件队列中
+                progress = int((done_count / self.stats['total']) * 100)
+                now = time.monotonic()
+                if progress != last_progress or now - last_emit_time >= PROGRESS_EMIT_INTERVAL:
+                    self.progress_updated.emit(progress, os.path.basename(file_path))
+                    last_progress = progress
+                    last_emit_time = now
+                
+                result = future.result()
+                if result['success'] and not result['skipped']:
+                    # 待写入的记录在批量提交时才计入导入数
+                    result = self._queue_record(file_path, result)
+                    if result['success'] and not result['skipped']:
+                        continue
                 
                 if result['success']:
-                    if result['skipped']:
-                        self.stats['skipped'] += 1
-                    else:
-                        self.stats['imported'] += 1
+                    self.stats['skipped'] += 1
                 else:
                     self.stats['errors'] += 1
                     self.stats['error_files'].append({
                         'file': file_path,
                         'error': result['error']
                     })
-            
-            # 完成导入
-            self.progress_updated.emit(100, "导入完成")
-            self.import_completed.emit(self.stats)
-            
-        except Exception as e:
-            self.error_occurred.emit(f"导入过程中发生错误: {str(e)}")
+        
+        # 写入剩余记录
+        self._flush_records()
     
-    def _import_single_file(self, file_path: str) -> Dict[str, Any]:
-        """导入单个文件"""
+    def _prepare_file(self, file_path: str) -> Dict[str, Any]:
+        """
+        准备单个文件的导入（在线程池中执行）
+        完成格式检查、去重、哈希计算和文件复制，不写数据库
+        """
         try:
             # 检查文件是否为图片
             if not self._is_image_file(file_path):
                 return {'success': False, 'error': '不是支持的图片格式'}
             
-            # 计算文件MD5和大小
-            file_md5 = self._calculate_file_md5(file_path)
+            # 先按文件大小预筛：库中没有相同大小的照片时不可能重复，
+            # 跳过复制前的哈希，改为复制后对目标文件计算MD5，使源文件只被读取一次
             file_size = os.path.getsize(file_path)
+            file_md5 = None
             
-            # 检查是否已存在
-            if self.db_manager.check_duplicate_photo(file_md5, file_size):
-                return {'success': True, 'skipped': True}
+            if file_size in self._existing_sizes:
+                file_md5 = self._calculate_file_md5(file_path)
+                
+                # 检查是否已存在
+                if (file_size, file_md5) in self._existing_keys:
+                    return {'success': True, 'skipped': True}
             
             # 获取照片拍摄时间
             photo_date = self._get_photo_date(file_path)
@@ -123,45 +306,102 @@ class PhotoImportWorker(QThread):
                 file_path, target_dir
             )
             
+            # 大小预筛未命中时，目标文件刚写入、仍在页缓存中，此时再计算MD5
+            if file_md5 is None:
+                file_md5 = self._calculate_file_md5(target_file_path)
+            
             # 获取相对路径（相对于照片库根目录）
             relative_path = os.path.relpath(target_file_path, self.target_library_path)
             
-            # 保存到数据库
+            # 键与 DatabaseManager.add_photo_records 的记录格式一致
+            filename = os.path.basename(target_file_path)
             photo_info = {
-                'filename': os.path.basename(target_file_path),
-                'file_path': relative_path,
-                'file_size': file_size,
-                'md5_hash': file_md5,
-                'date_taken': photo_date,
-                'date_imported': datetime.datetime.now(),
-                'original_path': file_path
+                'filename': filename,
+                'relative_path': relative_path,
+                'md5': file_md5,
+                'size': file_size,
+                'created_at': photo_date.isoformat(),
+                'photo_type': os.path.splitext(filename)[1].lower().lstrip('.')
             }
             
-            self.db_manager.add_photo_record(photo_info)
+            return {
+                'success': True,
+                'skipped': False,
+                'photo_info': photo_info,
+                'target_file_path': target_file_path
+            }
+            
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+    
+    def _queue_record(self, file_path: str, prepared: Dict[str, Any]) -> Dict[str, Any]:
+        """将准备好的照片记录加入写入队列，队列满时批量写入数据库（仅在导入线程中调用）"""
+        photo_info = prepared['photo_info']
+        key = (photo_info['size'], photo_info['md5'])
+        
+        try:
+            # 同一批次中内容相同的文件可能已被并行复制，只保留第一个
+            if key in self._existing_keys:
+                os.remove(prepared['target_file_path'])
+                return {'success': True, 'skipped': True}
+            
+            self._existing_keys.add(key)
+            self._existing_sizes.add(key[0])
+            self._pending_records.append((file_path, prepared['target_file_path'], photo_info))
+            
+            if len(self._pending_records) >= IMPORT_BATCH_SIZE:
+                self._flush_records()
             
             return {'success': True, 'skipped': False}
             
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
+    def _flush_records(self):
+        """在一个事务中批量写入队列中的照片记录"""
+        if not self._pending_records:
+            return
+        
+        records, self._pending_records = self._pending_records, []
+        
+        try:
+            with self._db_lock:
+                inserted = self.db_manager.add_photo_records([info for _, _, info in records])
+        except Exception as e:
+            self.stats['errors'] += len(records)
+            for file_path, target_file_path, _ in records:
+                # 记录未写入数据库，删除已复制的文件，避免库目录中留下无记录的照片
+                try:
+                    os.remove(target_file_path)
+                except OSError:
+                    pass
+                self.stats['error_files'].append({
+                    'file': file_path,
+                    'error': str(e)
+                })
+            return
+        
+        # 写入前已在内存中去重，未插入的记录是在此期间被其他写入方添加的照片
+        self.stats['imported'] += inserted
+        self.stats['skipped'] += len(records) - inserted
+    
     def _is_image_file(self, file_path: str) -> bool:
         """检查文件是否为支持的图片格式"""
-        supported_extensions = {
-            '.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.tif',
-            '.webp', '.raw', '.cr2', '.nef', '.arw', '.dng'
-        }
-        return Path(file_path).suffix.lower() in supported_extensions
+        return os.path.splitext(file_path)[1].lower() in SUPPORTED_IMAGE_EXTENSIONS
     
     def _calculate_file_md5(self, file_path: str) -> str:
-        """分块计算文件MD5值"""
-        hash_md5 = hashlib.md5()
-        chunk_size = 8192  # 8KB chunks
-        
+        """
+        计算文件MD5值
+        大文件通过mmap映射后整体交给hashlib，省去Python层的分块读取循环；
+        仍使用MD5以保持与已有照片库中md5列的去重兼容
+        """
         with open(file_path, "rb") as f:
-            while chunk := f.read(chunk_size):
-                hash_md5.update(chunk)
-        
-        return hash_md5.hexdigest()
+            file_size = os.fstat(f.fileno()).st_size
+            if file_size < MMAP_HASH_THRESHOLD:
+                return hashlib.md5(f.read()).hexdigest()
+            
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return hashlib.md5(mm).hexdigest()
     
     def _get_photo_date(self, file_path: str) -> datetime.datetime:
         """获取照片拍摄时间（优先EXIF，其次文件修改时间）"""
@@ -178,48 +418,35 @@ class PhotoImportWorker(QThread):
     def _extract_exif_date(self, file_path: str) -> Optional[datetime.datetime]:
         """从EXIF信息中提取拍摄时间"""
         
-        # 方法1：使用Pillow提取EXIF
+        # 方法1：使用exifread，只解析到DateTimeOriginal为止，
+        # 并跳过厂商私有标签(MakerNote)和缩略图的解析
         try:
-            with Image.open(file_path) as img:
-                exif_data = img._getexif()
-                if exif_data:
-                    # 尝试多个可能的时间字段
-                    time_tags = [
-                        'DateTimeOriginal',    # 原始拍摄时间
-                        'DateTime',            # 文件修改时间
-                        'DateTimeDigitized'    # 数字化时间
-                    ]
-                    
-                    for tag_id, value in exif_data.items():
-                        tag_name = TAGS.get(tag_id, tag_id)
-                        if tag_name in time_tags:
-                            try:
-                                return datetime.datetime.strptime(value, '%Y:%m:%d %H:%M:%S')
-                            except ValueError:
-                                continue
+            import exifread
+            
+            with open(file_path, 'rb') as f:
+                tags = exifread.process_file(
+                    f, stop_tag='DateTimeOriginal', details=False
+                )
+                
+                for tag_name in EXIFREAD_TIME_TAGS:
+                    if tag_name in tags:
+                        photo_date = _parse_exif_datetime(str(tags[tag_name]))
+                        if photo_date:
+                            return photo_date
         except Exception:
             pass
         
-        # 方法2：使用exifread库
+        # 方法2：exifread未找到时，使用Pillow提取EXIF
         try:
-            with open(file_path, 'rb') as f:
-                tags = exifread.process_file(f, stop_tag='EXIF DateTimeOriginal')
-                
-                # 尝试多个可能的EXIF标签
-                exif_time_tags = [
-                    'EXIF DateTimeOriginal',
-                    'EXIF DateTime',
-                    'EXIF DateTimeDigitized',
-                    'Image DateTime'
-                ]
-                
-                for tag_name in exif_time_tags:
-                    if tag_name in tags:
-                        try:
-                            time_str = str(tags[tag_name])
-                            return datetime.datetime.strptime(time_str, '%Y:%m:%d %H:%M:%S')
-                        except ValueError:
-                            continue
+            from PIL import Image
+            
+            with Image.open(file_path) as img:
+                exif_data = img._getexif()
+                if exif_data:
+                    for tag_id in _exif_time_tag_ids():
+                        photo_date = _parse_exif_datetime(exif_data.get(tag_id))
+                        if photo_date:
+                            return photo_date
         except Exception:
             pass
         
@@ -232,7 +459,11 @@ class PhotoImportWorker(QThread):
         day = photo_date.strftime('%d')
         
         date_dir = os.path.join(self.target_library_path, 'photos', year, month, day)
-        os.makedirs(date_dir, exist_ok=True)
+        
+        # 同一天的照片只需创建一次目录
+        if date_dir not in self._created_dirs:
+            os.makedirs(date_dir, exist_ok=True)
+            self._created_dirs.add(date_dir)
         
         return date_dir
     
@@ -241,26 +472,57 @@ class PhotoImportWorker(QThread):
         filename = os.path.basename(source_path)
         name, ext = os.path.splitext(filename)
         
-        target_path = os.path.join(target_dir, filename)
+        candidate = filename
         counter = 1
         
-        # 处理文件名冲突
-        while os.path.exists(target_path):
-            new_filename = f"{name}_{counter:03d}{ext}"
-            target_path = os.path.join(target_dir, new_filename)
-            counter += 1
+        # 处理文件名冲突；多个线程可能同时复制同名文件，
+        # 在锁内选定文件名并创建占位文件，复制本身在锁外进行
+        with self._copy_lock:
+            # 每个目标目录只列一次，之后在内存中判断文件名是否已被占用
+            existing_names = self._dir_contents.get(target_dir)
+            if existing_names is None:
+                existing_names = {entry.name for entry in os.scandir(target_dir)}
+                self._dir_contents[target_dir] = existing_names
+            
+            while True:
+                if candidate not in existing_names:
+                    try:
+                        # 以独占方式创建占位文件，防止与外部程序写入的同名文件冲突
+                        open(os.path.join(target_dir, candidate), 'xb').close()
+                        break
+                    except FileExistsError:
+                        existing_names.add(candidate)
+                
+                candidate = f"{name}_{counter:03d}{ext}"
+                counter += 1
+            
+            existing_names.add(candidate)
+        
+        target_path = os.path.join(target_dir, candidate)
         
-        # 复制文件
-        shutil.copy2(source_path, target_path)
+        # 复制文件；失败时删除占位文件（或复制了一部分的文件），不在库中留下空文件
+        try:
+            _fast_copy(source_path, target_path)
+        except BaseException:
+            try:
+                os.remove(target_path)
+            except OSError:
+                pass
+            with self._copy_lock:
+                existing_names.discard(candidate)
+            raise
         return target_path
 
 
 class PhotoImporter:
     """照片导入管理器"""
     
-    def __init__(self, library_path: str):
+    def __init__(self, library_path: str, db_path: Optional[str] = None):
         self.library_path = library_path
-        self.db_manager = DatabaseManager()
+        if db_path is None:
+            db_path = os.path.join(library_path, LIBRARY_DB_FILENAME)
+        self.db_manager = DatabaseManager(db_path)
+        self.db_manager.initialize()
         
         # 设置日志
         logging.basicConfig(
@@ -271,6 +533,8 @@ class PhotoImporter:
     
     def select_files_dialog(self, parent=None) -> List[str]:
         """显示文件选择对话框"""
+        from PyQt6.QtWidgets import QFileDialog
+        
         file_dialog = QFileDialog(parent)
         file_dialog.setFileMode(QFileDialog.FileMode.ExistingFiles)
         file_dialog.setNameFilter(
@@ -283,6 +547,8 @@ class PhotoImporter:
     
     def select_directory_dialog(self, parent=None) -> str:
         """显示目录选择对话框"""
+        from PyQt6.QtWidgets import QFileDialog
+        
         directory = QFileDialog.getExistingDirectory(
             parent,
             "选择包含照片的目录",
@@ -293,18 +559,36 @@ class PhotoImporter:
     
     def scan_directory_for_images(self, directory: str) -> List[str]:
         """扫描目录中的所有图片文件"""
-        image_files = []
-        supported_extensions = {
-            '.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.tif',
-            '.webp', '.raw', '.cr2', '.nef', '.arw', '.dng'
-        }
-        
-        for root, dirs, files in os.walk(directory):
-            for file in files:
-                if Path(file).suffix.lower() in supported_extensions:
-                    image_files.append(os.path.join(root, file))
-        
-        return image_files
+        return list(self._iter_image_files(directory))
+    
+    def _iter_image_files(self, directory: str):
+        """
+        逐个产出目录树中的图片文件路径
+        基于os.scandir，直接使用目录项自带的类型信息，避免逐个文件stat和拼接路径；
+        不进入指向目录的符号链接（避免循环）、隐藏目录和SKIPPED_SCAN_DIRS中的目录，
+        无法读取的目录会被跳过
+        """
+        pending_dirs = [directory]
+        
+        while pending_dirs:
+            current_dir = pending_dirs.pop()
+            try:
+                with os.scandir(current_dir) as entries:
+                    for entry in entries:
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+                        
+                        if is_dir:
+                            if (not entry.is_symlink()
+                                    and not entry.name.startswith('.')
+                                    and entry.name not in SKIPPED_SCAN_DIRS):
+                                pending_dirs.append(entry.path)
+                        elif os.path.splitext(entry.name)[1].lower() in SUPPORTED_IMAGE_EXTENSIONS:
+                            yield entry.path
+            except OSError:
+                continue
     
     def import_photos_with_progress(self, files: List[str], parent=None) -> Dict[str, Any]:
         """带进度显示的照片导入"""
@@ -312,13 +596,15 @@ class PhotoImporter:
             return {'success': False, 'error': '没有选择文件'}
         
         # 创建进度对话框
+        from PyQt6.QtWidgets import QProgressDialog
+        
         progress_dialog = QProgressDialog("正在导入照片...", "取消", 0, 100, parent)
         progress_dialog.setWindowTitle("照片导入")
         progress_dialog.setModal(True)
         progress_dialog.show()
         
         # 创建工作线程
-        worker = PhotoImportWorker(files, self.library_path)
+        worker = PhotoImportWorker(files, self.library_path, self.db_manager)
         
         # 连接信号
         worker.progress_updated.connect(
@@ -343,28 +629,31 @@ class PhotoImporter:
         # 处理取消按钮
         progress_dialog.canceled.connect(worker.stop_import)
         
+        # 在局部事件循环中等待线程结束，界面保持响应且不占用CPU空转；
+        # finished 在线程结束后以队列方式投递，即使导入很快完成也不会错过
+        loop = QEventLoop()
+        worker.finished.connect(loop.quit)
+        
         # 启动导入
         worker.start()
-        
-        # 等待完成
-        while worker.isRunning():
-            QApplication.processEvents()
+        loop.exec()
         
         worker.wait()
         
         return result
     
-    def _update_progress(self, dialog: QProgressDialog, value: int, filename: str):
+    def _update_progress(self, dialog: 'QProgressDialog', value: int, filename: str):
         """更新进度对话框"""
         dialog.setValue(value)
         dialog.setLabelText(f"正在处理: {filename}")
-        QApplication.processEvents()
 
 
 def test_photo_importer():
     """测试照片导入功能"""
     import sys
-    from PyQt6.QtWidgets import QApplication, QMainWindow, QPushButton, QVBoxLayout, QWidget
+    from PyQt6.QtWidgets import (
+        QApplication, QMainWindow, QMessageBox, QPushButton, QVBoxLayout, QWidget
+    )
     
     class TestWindow(QMainWindow):
         def __init__(self):
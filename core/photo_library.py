@@ -77,6 +77,9 @@ class PhotoLibrary:
                 print("数据库初始化失败")
                 return False
             
+            # 让查询规划器掌握新建索引的统计信息
+            self.database.analyze()
+            
             # 创建库信息文件
             self._create_library_info(path)
             
@@ -5,16 +5,104 @@
 封装配置相关的数据库操作，提供清晰的接口
 """
 
+import copy
 import sqlite3
-import json
-from typing import Optional, Dict, List, Any
+import threading
+from typing import Optional, Dict, List, Any, Iterable, Iterator, Tuple
 from datetime import datetime
-from .database import Database
+
+from libs import fast_json
+from .database import Database, SQLITE_HAS_RETURNING
+
+
+# LIKE中需要转义的字符，转义符为反斜杠（配合 ESCAPE '\\' 使用）
+_LIKE_ESCAPE_TABLE = str.maketrans({'\\': '\\\\', '%': '\\%', '_': '\\_'})
+
+
+def _escape_like(text: str) -> str:
+    """
+    转义字符串中的LIKE通配符，使其在LIKE模式中按字面匹配
+    
+    Args:
+        text: 原始字符串
+        
+    Returns:
+        转义后的字符串
+    """
+    return text.translate(_LIKE_ESCAPE_TABLE)
+
+
+# JSON文本可能的首字符；以其他字符开头的值一定是普通字符串，无需尝试解析
+_JSON_START_CHARS = frozenset('{["tfn-0123456789')
+
+
+def _decode_value(value: Any) -> Any:
+    """
+    解析存储的配置值：JSON格式的值返回解析结果，否则原样返回
+    
+    Args:
+        value: 数据库中存储的字符串
+        
+    Returns:
+        解析后的配置值
+    """
+    if not isinstance(value, str) or not value or value[0] not in _JSON_START_CHARS:
+        return value
+    
+    try:
+        return fast_json.loads(value)
+    except fast_json.JSONDecodeError:
+        return value
 
 
 class ConfigDAO:
     """配置数据访问对象"""
     
+    # 固定的SQL文本，使sqlite3按文本缓存的已编译语句在调用间复用
+    GET_CONFIG_SQL = "SELECT value FROM config WHERE key = ?"
+    
+    # 更新时间由SQLite生成（本地时间，ISO格式），省去Python端的datetime调用
+    SET_CONFIG_SQL = (
+        "INSERT OR REPLACE INTO config (key, value, updated_at) "
+        "VALUES (?, ?, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime'))"
+    )
+    
+    # 批量写入时整批共用一个预先计算的更新时间
+    SET_CONFIG_AT_SQL = (
+        "INSERT OR REPLACE INTO config (key, value, updated_at) VALUES (?, ?, ?)"
+    )
+    
+    GET_ALL_CONFIGS_SQL = "SELECT key, value FROM config ORDER BY key"
+    
+    DELETE_CONFIG_SQL = "DELETE FROM config WHERE key = ?"
+    
+    POP_CONFIG_SQL = "DELETE FROM config WHERE key = ? RETURNING value"
+    
+    CONFIG_EXISTS_SQL = "SELECT 1 FROM config WHERE key = ?"
+    
+    GET_CONFIG_WITH_METADATA_SQL = (
+        "SELECT key, value, updated_at FROM config WHERE key = ?"
+    )
+    
+    SEARCH_CONFIGS_SQL = (
+        "SELECT key, value, updated_at FROM config WHERE key LIKE ? ESCAPE '\\' ORDER BY key"
+    )
+    
+    SEARCH_CONFIGS_RANGE_SQL = (
+        "SELECT key, value, updated_at FROM config WHERE key >= ? AND key < ? ORDER BY key"
+    )
+    
+    # 前缀的后继字符不可用时的前缀查询，按字符逐一比较，同样区分大小写
+    SEARCH_CONFIGS_SUBSTR_SQL = (
+        "SELECT key, value, updated_at FROM config "
+        "WHERE key >= ? AND substr(key, 1, ?) = ? ORDER BY key"
+    )
+    
+    CONFIG_COUNT_SQL = "SELECT COUNT(*) as count FROM config"
+    
+    # 由数据库触发器维护的配置，值会在本类之外变化，总是直接从数据库读取
+    UNCACHED_KEYS = frozenset(('photo_count',))
+    
     def __init__(self, database: Database):
         """
         初始化ConfigDAO
@@ -23,6 +111,54 @@ class ConfigDAO:
             database: 数据库实例
         """
         self.db = database
+        
+        # 进程内配置缓存：首次读取时整表加载，之后由本类的写操作同步更新；
+        # 共享同一Database的其他实例或数据库层写入配置时，按 db.config_generation 重新加载
+        self._cache: Dict[str, Any] = {}
+        self._cache_loaded = False
+        self._cache_generation = -1
+        self._cache_lock = threading.RLock()
+    
+    def _ensure_cache(self) -> bool:
+        """
+        确保配置缓存可用，未加载或数据库层写入过配置时重新整表加载
+        
+        Returns:
+            缓存是否可用
+        """
+        if self._cache_loaded and self._cache_generation == self.db.config_generation:
+            return True
+        
+        generation = self.db.config_generation
+        try:
+            # 读操作不持写锁，使用独立游标，避免与其他线程共用 db.cursor
+            rows = self.db.connection.execute(self.GET_ALL_CONFIGS_SQL).fetchall()
+        except sqlite3.Error as e:
+            print(f"加载配置缓存失败: {e}")
+            return False
+        
+        decode = _decode_value
+        self._cache = {key: decode(value) for key, value in rows}
+        self._cache_generation = generation
+        self._cache_loaded = True
+        return True
+    
+    def _bump_generation(self) -> None:
+        """
+        配置写入提交后递增数据库的配置版本号，使共享同一Database的其他ConfigDAO重新加载缓存；
+        本实例的缓存此前已是最新且已同步本次写入时跟随新版本号，不必重新加载
+        （调用时需持有 db.write_lock 和 _cache_lock）
+        """
+        current = self._cache_loaded and self._cache_generation == self.db.config_generation
+        self.db.config_generation += 1
+        if current:
+            self._cache_generation = self.db.config_generation
+    
+    def invalidate_cache(self):
+        """使配置缓存失效，下次读取时从数据库重新加载"""
+        with self._cache_lock:
+            self._cache_loaded = False
+            self._cache.clear()
     
     def get_config(self, key: str, default: Any = None) -> Any:
         """
@@ -35,19 +171,21 @@ class ConfigDAO:
         Returns:
             配置值，不存在时返回默认值
         """
+        with self._cache_lock:
+            if key not in self.UNCACHED_KEYS and self._ensure_cache():
+                if key not in self._cache:
+                    return default
+                value = self._cache[key]
+                # 字典和列表返回副本，避免调用方修改到缓存内容
+                if isinstance(value, (dict, list)):
+                    return copy.deepcopy(value)
+                return value
+        
         try:
-            self.db.cursor.execute('''
-                SELECT value FROM config WHERE key = ?
-            ''', (key,))
-            
-            result = self.db.cursor.fetchone()
+            result = self.db.connection.execute(self.GET_CONFIG_SQL, (key,)).fetchone()
             if result:
-                value = result['value']
                 # 尝试解析JSON格式的值
-                try:
-                    return json.loads(value)
-                except (json.JSONDecodeError, TypeError):
-                    return value
+                return _decode_value(result['value'])
             return default
             
         except sqlite3.Error as e:
@@ -65,24 +203,38 @@ class ConfigDAO:
         Returns:
             是否设置成功
         """
+        value_str = self._serialize_value(value)
+        
+        # 连接由导入线程等共享，写操作持写锁并使用独立游标，不与其他线程的事务交错
+        with self.db.write_lock:
+            try:
+                self.db.connection.execute(self.SET_CONFIG_SQL, (key, value_str))
+                
+                self.db.connection.commit()
+                
+                # 缓存中保存与从数据库读回时一致的值
+                with self._cache_lock:
+                    if self._cache_loaded:
+                        self._cache[key] = _decode_value(value_str)
+                    self._bump_generation()
+                return True
+                
+            except sqlite3.Error as e:
+                print(f"设置配置失败: {e}")
+                return False
+    
+    @staticmethod
+    def _serialize_value(value: Any) -> str:
+        """
+        将配置值统一序列化为JSON存储，字符串、布尔值和None都能按原类型读回
+        
+        早期版本中标量以str()形式存储，读取时无法解析为JSON的值按原字符串返回，因此旧数据无需迁移
+        """
         try:
-            # 如果值是复杂类型，转换为JSON字符串
-            if isinstance(value, (dict, list, tuple)):
-                value_str = json.dumps(value, ensure_ascii=False)
-            else:
-                value_str = str(value)
-            
-            self.db.cursor.execute('''
-                INSERT OR REPLACE INTO config (key, value, updated_at)
-                VALUES (?, ?, ?)
-            ''', (key, value_str, datetime.now().isoformat()))
-            
-            self.db.connection.commit()
-            return True
-            
-        except sqlite3.Error as e:
-            print(f"设置配置失败: {e}")
-            return False
+            return fast_json.dumps(value)
+        except TypeError:
+            # JSON无法表示的类型沿用早期的字符串形式
+            return str(value)
     
     def get_all_configs(self) -> Dict[str, Any]:
         """
@@ -91,26 +243,23 @@ class ConfigDAO:
         Returns:
             配置字典
         """
-        configs = {}
+        return dict(self.iter_configs())
+    
+    def iter_configs(self) -> Iterator[Tuple[str, Any]]:
+        """
+        按键名顺序逐条产出所有配置，使用独立的游标
+        
+        Yields:
+            (配置键, 配置值)
+        """
+        decode = _decode_value
         try:
-            self.db.cursor.execute('''
-                SELECT key, value FROM config ORDER BY key
-            ''')
-            
-            for row in self.db.cursor.fetchall():
-                key = row['key']
-                value = row['value']
-                
+            for row in self.db.connection.execute(self.GET_ALL_CONFIGS_SQL):
                 # 尝试解析JSON格式的值
-                try:
-                    configs[key] = json.loads(value)
-                except (json.JSONDecodeError, TypeError):
-                    configs[key] = value
+                yield row['key'], decode(row['value'])
             
         except sqlite3.Error as e:
             print(f"获取所有配置失败: {e}")
-        
-        return configs
     
     def delete_config(self, key: str) -> bool:
         """
@@ -122,17 +271,99 @@ class ConfigDAO:
         Returns:
             是否删除成功
         """
-        try:
-            self.db.cursor.execute('''
-                DELETE FROM config WHERE key = ?
-            ''', (key,))
+        with self.db.write_lock:
+            try:
+                deleted = self.db.connection.execute(self.DELETE_CONFIG_SQL, (key,)).rowcount > 0
+                
+                self.db.connection.commit()
+                
+                with self._cache_lock:
+                    self._cache.pop(key, None)
+                    self._bump_generation()
+                return deleted
+                
+            except sqlite3.Error as e:
+                print(f"删除配置失败: {e}")
+                return False
+    
+    def pop_config(self, key: str, default: Any = None) -> Any:
+        """
+        删除配置项并返回删除前的值
+        
+        Args:
+            key: 配置键
+            default: 配置不存在时的返回值
             
-            self.db.connection.commit()
-            return self.db.cursor.rowcount > 0
+        Returns:
+            被删除的配置值，不存在时返回默认值
+        """
+        connection = self.db.connection
+        with self.db.write_lock:
+            try:
+                if SQLITE_HAS_RETURNING:
+                    # 一条语句完成读取和删除
+                    rows = connection.execute(self.POP_CONFIG_SQL, (key,)).fetchall()
+                else:
+                    rows = connection.execute(self.GET_CONFIG_SQL, (key,)).fetchall()
+                    if rows:
+                        connection.execute(self.DELETE_CONFIG_SQL, (key,))
+                
+                connection.commit()
+                
+                with self._cache_lock:
+                    self._cache.pop(key, None)
+                    self._bump_generation()
+                
+                return _decode_value(rows[0]['value']) if rows else default
+                
+            except sqlite3.Error as e:
+                print(f"删除配置失败: {e}")
+                return default
+    
+    def delete_configs(self, keys: Iterable[str]) -> int:
+        """
+        批量删除配置项，在一个事务中执行并只提交一次
+        调用时已处于事务中则在该事务中删除，不提交也不回滚
+        
+        Args:
+            keys: 配置键列表
             
-        except sqlite3.Error as e:
-            print(f"删除配置失败: {e}")
-            return False
+        Returns:
+            实际删除的配置项数量
+        """
+        keys = list(keys)
+        if not keys:
+            return 0
+        
+        connection = self.db.connection
+        with self.db.write_lock:
+            # 调用方已开启事务时并入其中，由调用方决定提交或回滚
+            owns_transaction = not connection.in_transaction
+            try:
+                if owns_transaction:
+                    connection.execute('BEGIN IMMEDIATE')
+                
+                changes_before = connection.total_changes
+                connection.executemany(self.DELETE_CONFIG_SQL, [(key,) for key in keys])
+                if owns_transaction:
+                    connection.commit()
+                deleted = connection.total_changes - changes_before
+                
+                with self._cache_lock:
+                    if owns_transaction:
+                        removed = set(keys)
+                        self._cache = {k: v for k, v in self._cache.items() if k not in removed}
+                    else:
+                        # 调用方仍可能回滚，下次读取时按数据库内容重新加载
+                        self._cache_loaded = False
+                    self._bump_generation()
+                return deleted
+                
+            except sqlite3.Error as e:
+                print(f"批量删除配置失败: {e}")
+                if owns_transaction:
+                    connection.rollback()
+                return 0
     
     def config_exists(self, key: str) -> bool:
         """
@@ -144,12 +375,12 @@ class ConfigDAO:
         Returns:
             是否存在
         """
+        with self._cache_lock:
+            if self._ensure_cache():
+                return key in self._cache
+        
         try:
-            self.db.cursor.execute('''
-                SELECT 1 FROM config WHERE key = ?
-            ''', (key,))
-            
-            return self.db.cursor.fetchone() is not None
+            return self.db.connection.execute(self.CONFIG_EXISTS_SQL, (key,)).fetchone() is not None
             
         except sqlite3.Error as e:
             print(f"检查配置存在性失败: {e}")
@@ -166,18 +397,11 @@ class ConfigDAO:
             包含值和元数据的字典，不存在返回None
         """
         try:
-            self.db.cursor.execute('''
-                SELECT key, value, updated_at FROM config WHERE key = ?
-            ''', (key,))
-            
-            result = self.db.cursor.fetchone()
+            result = self.db.connection.execute(self.GET_CONFIG_WITH_METADATA_SQL, (key,)).fetchone()
             if result:
                 value = result['value']
                 # 尝试解析JSON格式的值
-                try:
-                    parsed_value = json.loads(value)
-                except (json.JSONDecodeError, TypeError):
-                    parsed_value = value
+                parsed_value = _decode_value(value)
                 
                 return {
                     'key': result['key'],
@@ -196,32 +420,51 @@ class ConfigDAO:
         搜索配置项
         
         Args:
-            pattern: 搜索模式（支持SQL LIKE语法）
+            pattern: 搜索模式（支持SQL LIKE语法，反斜杠为转义符，可用_escape_like转义字面文本）
             
         Returns:
             匹配的配置列表
         """
+        return self._search_configs(self.SEARCH_CONFIGS_SQL, (pattern,))
+    
+    def search_configs_prefix(self, prefix: str) -> List[Dict[str, Any]]:
+        """
+        搜索以指定前缀开头的配置项（区分大小写）
+        
+        以主键范围查询实现，不受LIKE大小写设置影响，始终走索引
+        
+        Args:
+            prefix: 配置键前缀
+            
+        Returns:
+            匹配的配置列表
+        """
+        if not prefix:
+            return self._search_configs(self.SEARCH_CONFIGS_SQL, ('%',))
+        
+        last = ord(prefix[-1])
+        if last >= 0x10FFFF or 0xD800 <= last + 1 <= 0xDFFF:
+            # 没有后继字符，或后继是无法编码为UTF-8的代理字符
+            return self._search_configs(
+                self.SEARCH_CONFIGS_SUBSTR_SQL, (prefix, len(prefix), prefix)
+            )
+        
+        upper = prefix[:-1] + chr(last + 1)
+        return self._search_configs(self.SEARCH_CONFIGS_RANGE_SQL, (prefix, upper))
+    
+    def _search_configs(self, sql: str, params: Tuple) -> List[Dict[str, Any]]:
+        """执行配置搜索SQL并构建结果列表"""
         configs = []
+        # 循环内使用局部变量，省去每行的属性查找
+        append = configs.append
+        decode = _decode_value
         try:
-            self.db.cursor.execute('''
-                SELECT key, value, updated_at FROM config 
-                WHERE key LIKE ? 
-                ORDER BY key
-            ''', (pattern,))
-            
-            for row in self.db.cursor.fetchall():
-                value = row['value']
-                # 尝试解析JSON格式的值
-                try:
-                    parsed_value = json.loads(value)
-                except (json.JSONDecodeError, TypeError):
-                    parsed_value = value
-                
-                configs.append({
-                    'key': row['key'],
-                    'value': parsed_value,
+            for key, value, updated_at in self.db.connection.execute(sql, params):
+                append({
+                    'key': key,
+                    'value': decode(value),  # 尝试解析JSON格式的值
                     'raw_value': value,
-                    'updated_at': row['updated_at']
+                    'updated_at': updated_at
                 })
             
         except sqlite3.Error as e:
@@ -236,11 +479,12 @@ class ConfigDAO:
         Returns:
             配置项总数
         """
+        with self._cache_lock:
+            if self._ensure_cache():
+                return len(self._cache)
+        
         try:
-            self.db.cursor.execute('''
-                SELECT COUNT(*) as count FROM config
-            ''')
-            result = self.db.cursor.fetchone()
+            result = self.db.connection.execute(self.CONFIG_COUNT_SQL).fetchone()
             return result['count'] if result else 0
             
         except sqlite3.Error as e:
@@ -263,6 +507,7 @@ class ConfigDAO:
     def restore_configs(self, backup: Dict[str, Any]) -> bool:
         """
         从备份恢复配置
+        调用时已处于事务中则在该事务中写入，不提交也不回滚
         
         Args:
             backup: 配置备份字典
@@ -270,32 +515,52 @@ class ConfigDAO:
         Returns:
             是否恢复成功
         """
-        try:
-            if 'configs' not in backup:
-                print("无效的备份格式")
-                return False
-            
-            # 开始事务
-            self.db.cursor.execute('BEGIN TRANSACTION')
-            
-            # 清空现有配置（可选，根据需求决定）
-            # self.db.cursor.execute('DELETE FROM config')
-            
-            # 恢复配置
-            success_count = 0
-            for key, value in backup['configs'].items():
-                if self.set_config(key, value):
-                    success_count += 1
-            
-            self.db.connection.commit()
-            print(f"成功恢复 {success_count} 个配置项")
-            return True
-            
-        except sqlite3.Error as e:
-            print(f"恢复配置失败: {e}")
-            if self.db.connection:
-                self.db.connection.rollback()
+        if 'configs' not in backup:
+            print("无效的备份格式")
             return False
+        
+        # 所有配置共用一个更新时间，在一个事务中批量写入，只提交一次
+        updated_at = datetime.now().isoformat()
+        rows = [
+            (key, self._serialize_value(value), updated_at)
+            for key, value in backup['configs'].items()
+        ]
+        
+        connection = self.db.connection
+        with self.db.write_lock:
+            # 调用方已开启事务时并入其中，由调用方决定提交或回滚
+            owns_transaction = not connection.in_transaction
+            try:
+                # 开始事务
+                if owns_transaction:
+                    connection.execute('BEGIN IMMEDIATE')
+                
+                # 清空现有配置（可选，根据需求决定）
+                # connection.execute('DELETE FROM config')
+                
+                # 恢复配置
+                connection.executemany(self.SET_CONFIG_AT_SQL, rows)
+                
+                if owns_transaction:
+                    connection.commit()
+                
+                with self._cache_lock:
+                    if not owns_transaction:
+                        # 调用方仍可能回滚，不把未提交的值写入缓存，下次读取时重新加载
+                        self._cache_loaded = False
+                    elif self._cache_loaded:
+                        self._cache.update(
+                            (key, _decode_value(value_str)) for key, value_str, _ in rows
+                        )
+                    self._bump_generation()
+                print(f"成功恢复 {len(rows)} 个配置项")
+                return True
+                
+            except sqlite3.Error as e:
+                print(f"恢复配置失败: {e}")
+                if owns_transaction:
+                    connection.rollback()
+                return False
     
     # 便捷方法：常用配置的快捷访问
     def get_photo_library_path(self) -> str:
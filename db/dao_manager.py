@@ -6,15 +6,111 @@ DAO管理器
 """
 
 import os
-from typing import Optional, Dict, List, Any
-from .database import Database
-from .photo_dao import PhotoDAO
+import sqlite3
+from contextlib import closing
+from itertools import groupby
+from operator import itemgetter
+from typing import Optional, Dict, List, Any, Tuple, Iterator
+from .database import Database, day_after
+from .photo_dao import PhotoDAO, row_to_photo
 from .config_dao import ConfigDAO
 
 
+# 只折叠ASCII字母，与SQLite中LIKE和NOCASE排序规则的大小写处理一致
+_ASCII_LOWER = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+
+def _like_prefix_range(pattern: str) -> Optional[Tuple[str, str]]:
+    """
+    将纯前缀的LIKE模式（如 "IMG_2025%"）转换为等价的范围查询边界
+    
+    Args:
+        pattern: LIKE模式
+        
+    Returns:
+        (下界, 上界)，模式不是纯前缀或无法得到正确上界时返回None
+    """
+    if len(pattern) < 2 or not pattern.endswith('%'):
+        return None
+    
+    prefix = pattern[:-1]
+    if '%' in prefix or '_' in prefix:
+        return None
+    
+    lower = prefix.translate(_ASCII_LOWER)
+    last = ord(lower[-1])
+    if last >= 0x10FFFF or 0xD800 <= last + 1 <= 0xDFFF:
+        # 没有后继字符，或后继是无法编码为UTF-8的代理字符
+        return None
+    
+    upper_last = chr(last + 1)
+    if upper_last.translate(_ASCII_LOWER) != upper_last:
+        # 后继字符在NOCASE下会被折叠（如 '@' 的后继 'A' 等同于 'a'），上界不再紧贴前缀，回退为LIKE
+        return None
+    
+    return lower, lower[:-1] + upper_last
+
+
+def _iter_photos(cursor: sqlite3.Cursor) -> Iterator[Dict]:
+    """
+    逐行将照片查询结果转换为字典，并解析EXIF JSON为 exif_data
+    
+    Args:
+        cursor: 已执行照片查询的游标
+        
+    Yields:
+        照片字典
+    """
+    for row in cursor:
+        yield row_to_photo(row)
+
+
+# search_photos 的文件名条件：无、前缀范围、通用LIKE、全文索引上的LIKE
+_FILENAME_CONDITIONS = {
+    None: "",
+    'prefix': "AND filename >= :low COLLATE NOCASE AND filename < :high COLLATE NOCASE",
+    'like': "AND filename LIKE :pattern",
+    # 在文件名全文索引（trigram）上匹配LIKE模式，见 Database.has_filename_fts
+    'fts': "AND id IN (SELECT rowid FROM photos_fts WHERE filename LIKE :pattern)",
+}
+
+
+def _search_photos_sql(has_start: bool, has_end: bool, filename_mode: Optional[str]) -> str:
+    """
+    生成search_photos使用的SQL，廉价的等值和范围条件在前，文件名条件放在最后
+    
+    日期条件只在指定时出现（写成 ":start IS NULL OR ..." 的形式会使created_at索引失效），
+    created_at 为ISO格式文本，直接按字符串比较半开区间，不包装DATE()
+    """
+    date_conditions = ""
+    if has_start:
+        date_conditions += "AND created_at >= :start "
+    if has_end:
+        date_conditions += "AND created_at < :end_before "
+    
+    return f'''
+        SELECT * FROM photos
+        WHERE is_deleted = 0
+          AND (:type IS NULL OR type = :type)
+          {date_conditions}
+          {_FILENAME_CONDITIONS[filename_mode]}
+        ORDER BY imported_at DESC
+        LIMIT :limit
+    '''
+
+
 class DAOManager:
     """DAO管理器，提供统一的数据库访问接口"""
     
+    # search_photos 可能用到的全部SQL文本（日期上下界有无 × 文件名条件），预先生成，
+    # 保证同一种查询形态总是同一段文本，可以命中已编译语句缓存
+    SEARCH_PHOTOS_SQL = {
+        (has_start, has_end, filename_mode): _search_photos_sql(has_start, has_end, filename_mode)
+        for has_start in (False, True)
+        for has_end in (False, True)
+        for filename_mode in _FILENAME_CONDITIONS
+    }
+    
     def __init__(self, db_path: str):
         """
         初始化DAO管理器
@@ -23,7 +119,8 @@ class DAOManager:
             db_path: 数据库文件路径
         """
         self.db_path = db_path
-        self.database = Database(db_path)
+        # 与同一数据库文件的DatabaseManager（导入线程等）共享一个已连接的Database实例
+        self.database = Database.get_or_create(db_path)
         self.photo_dao = PhotoDAO(self.database)
         self.config_dao = ConfigDAO(self.database)
         self._connected = False
@@ -45,9 +142,15 @@ class DAOManager:
         return True
     
     def close(self) -> None:
-        """关闭数据库连接"""
-        if self.database:
-            self.database.close()
+        """
+        结束本管理器的使用
+        连接由同一数据库文件的所有管理器共享，此处不关闭；需要真正关闭时调用shutdown
+        """
+        self._connected = False
+    
+    def shutdown(self) -> None:
+        """关闭并释放该数据库文件的共享连接（如删除数据库文件前）"""
+        Database.release_shared(self.db_path)
         self._connected = False
     
     def is_connected(self) -> bool:
@@ -81,10 +184,32 @@ class DAOManager:
         Returns:
             照片ID，失败返回None
         """
-        return self.photo_dao.insert_photo(
-            filename, path, md5, size, created_at, 
-            photo_type, exif_data, thumbnail_path
-        )
+        try:
+            photo_ids = self.add_photos_bulk([{
+                'filename': filename,
+                'path': path,
+                'md5': md5,
+                'size': size,
+                'created_at': created_at,
+                'photo_type': photo_type,
+                'exif_data': exif_data,
+                'thumbnail_path': thumbnail_path
+            }])
+        except sqlite3.Error:
+            return None
+        return photo_ids[0]
+    
+    def add_photos_bulk(self, photos: List[Dict[str, Any]]) -> List[Optional[int]]:
+        """
+        批量添加照片记录，所有记录在一个事务中写入，写入失败时抛出 sqlite3.Error
+        
+        Args:
+            photos: 照片字典列表，键与add_photo的参数相同（路径键为path）
+            
+        Returns:
+            与输入一一对应的照片ID列表，已存在的照片为None
+        """
+        return self.photo_dao.insert_photos(photos)
     
     def get_photo_by_id(self, photo_id: int) -> Optional[Dict]:
         """根据ID获取照片信息"""
@@ -115,63 +240,68 @@ class DAOManager:
         Returns:
             照片列表
         """
+        return list(self.iter_search_photos(
+            filename_pattern, start_date, end_date, photo_type, md5, limit
+        ))
+    
+    def iter_search_photos(self, 
+                          filename_pattern: Optional[str] = None,
+                          start_date: Optional[str] = None,
+                          end_date: Optional[str] = None,
+                          photo_type: Optional[str] = None,
+                          md5: Optional[str] = None,
+                          limit: int = 100) -> Iterator[Dict]:
+        """
+        多条件搜索照片，逐条产出结果而不是一次性构建列表
+        
+        参数同search_photos；查询使用独立的游标，迭代期间可以执行其他数据库操作
+        
+        Yields:
+            照片字典
+        """
         # 如果指定了MD5，直接查找
         if md5:
             photo = self.photo_dao.get_photo_by_md5(md5, 0)  # size=0表示忽略大小
-            return [photo] if photo else []
+            if photo:
+                yield photo
+            return
         
-        # 构建复合查询
-        conditions = ["is_deleted = 0"]
-        params = []
+        # 所有条件用命名参数绑定，类型未指定时以NULL短路；
+        # 日期和文件名条件决定使用哪一条预先生成的SQL
+        params = {
+            'type': photo_type or None,
+            'start': start_date or None,
+            'end_before': None,
+            'pattern': None,
+            'low': None,
+            'high': None,
+            'limit': limit,
+        }
         
+        filename_mode = None
         if filename_pattern:
-            conditions.append("filename LIKE ?")
-            params.append(filename_pattern)
-        
-        if start_date and end_date:
-            conditions.append("DATE(created_at) BETWEEN ? AND ?")
-            params.extend([start_date, end_date])
-        elif start_date:
-            conditions.append("DATE(created_at) >= ?")
-            params.append(start_date)
-        elif end_date:
-            conditions.append("DATE(created_at) <= ?")
-            params.append(end_date)
-        
-        if photo_type:
-            conditions.append("type = ?")
-            params.append(photo_type)
-        
-        params.append(limit)
+            prefix_range = _like_prefix_range(filename_pattern)
+            if prefix_range:
+                # 前缀匹配改写为范围条件，保证可以使用 filename NOCASE 索引
+                params['low'], params['high'] = prefix_range
+                filename_mode = 'prefix'
+            else:
+                params['pattern'] = filename_pattern
+                filename_mode = 'fts' if self.database.has_filename_fts else 'like'
         
         try:
-            sql = f'''
-                SELECT * FROM photos 
-                WHERE {' AND '.join(conditions)}
-                ORDER BY imported_at DESC 
-                LIMIT ?
-            '''
-            
-            self.database.cursor.execute(sql, params)
-            
-            photos = []
-            for row in self.database.cursor.fetchall():
-                photo = dict(row)
-                if photo['exif_json']:
-                    import json
-                    try:
-                        photo['exif_data'] = json.loads(photo['exif_json'])
-                    except json.JSONDecodeError:
-                        photo['exif_data'] = {}
-                else:
-                    photo['exif_data'] = {}
-                photos.append(photo)
+            if end_date:
+                # 包含结束日期当天：created_at < 结束日期的后一天
+                params['end_before'] = day_after(end_date)
             
-            return photos
+            sql = self.SEARCH_PHOTOS_SQL[bool(start_date), bool(end_date), filename_mode]
+            # 只读连接上查询，导入写入期间也不阻塞；提前停止迭代时关闭游标以结束读事务
+            with self.database.read_connection() as connection:
+                with closing(connection.execute(sql, params)) as cursor:
+                    yield from _iter_photos(cursor)
             
         except Exception as e:
             print(f"搜索照片失败: {e}")
-            return []
     
     def photo_exists(self, md5: str, size: int) -> bool:
         """检查照片是否已存在"""
@@ -189,6 +319,10 @@ class DAOManager:
         """删除照片"""
         return self.photo_dao.delete_photo(photo_id, soft_delete)
     
+    def delete_photos(self, photo_ids: List[int], soft_delete: bool = True) -> int:
+        """批量删除照片"""
+        return self.photo_dao.delete_photos(photo_ids, soft_delete)
+    
     # === 配置相关操作 ===
     
     def get_config(self, key: str, default: Any = None) -> Any:
@@ -207,6 +341,10 @@ class DAOManager:
         """删除配置项"""
         return self.config_dao.delete_config(key)
     
+    def delete_configs(self, keys: List[str]) -> int:
+        """批量删除配置项"""
+        return self.config_dao.delete_configs(keys)
+    
     # === 便捷方法 ===
     
     def get_photo_library_path(self) -> str:
@@ -250,22 +388,10 @@ class DAOManager:
         Returns:
             照片列表
         """
-        start_date = f"{year:04d}-{month:02d}-01"
-        
-        # 计算月末日期
-        if month == 12:
-            next_year = year + 1
-            next_month = 1
-        else:
-            next_year = year
-            next_month = month + 1
-        
-        from datetime import datetime, timedelta
-        next_month_start = datetime(next_year, next_month, 1)
-        month_end = next_month_start - timedelta(days=1)
-        end_date = month_end.strftime("%Y-%m-%d")
-        
-        return self.search_photos(start_date=start_date, end_date=end_date)
+        # 半开区间 [本月1日, 下月1日)
+        start = f"{year:04d}-{month:02d}-01"
+        end_before = f"{year + month // 12:04d}-{month % 12 + 1:02d}-01"
+        return self._search_created_range(start, end_before)
     
     def get_photos_by_year(self, year: int) -> List[Dict]:
         """
@@ -277,9 +403,33 @@ class DAOManager:
         Returns:
             照片列表
         """
-        start_date = f"{year:04d}-01-01"
-        end_date = f"{year:04d}-12-31"
-        return self.search_photos(start_date=start_date, end_date=end_date)
+        return self._search_created_range(f"{year:04d}-01-01", f"{year + 1:04d}-01-01")
+    
+    def _search_created_range(self, start: str, end_before: str, limit: int = 100) -> List[Dict]:
+        """
+        按创建时间的半开区间查询照片
+        
+        Args:
+            start: 开始日期（含，YYYY-MM-DD）
+            end_before: 结束日期（不含，YYYY-MM-DD）
+            limit: 返回数量限制
+            
+        Returns:
+            照片列表
+        """
+        try:
+            with self.database.read_connection() as connection:
+                cursor = connection.execute(self.SEARCH_PHOTOS_SQL[True, True, None], {
+                    'type': None,
+                    'start': start,
+                    'end_before': end_before,
+                    'limit': limit,
+                })
+                return list(_iter_photos(cursor))
+            
+        except Exception as e:
+            print(f"按日期范围查询照片失败: {e}")
+            return []
     
     def get_duplicate_photos(self) -> List[List[Dict]]:
         """
@@ -289,43 +439,26 @@ class DAOManager:
             重复照片组列表
         """
         try:
-            # 查找重复的MD5和大小组合
-            self.database.cursor.execute('''
-                SELECT md5, size, COUNT(*) as count
-                FROM photos 
-                WHERE is_deleted = 0
-                GROUP BY md5, size
-                HAVING count > 1
-            ''')
-            
-            duplicate_groups = []
-            for row in self.database.cursor.fetchall():
-                md5, size = row['md5'], row['size']
-                
-                # 获取该组的所有照片
-                self.database.cursor.execute('''
-                    SELECT * FROM photos 
-                    WHERE md5 = ? AND size = ? AND is_deleted = 0
-                    ORDER BY imported_at
-                ''', (md5, size))
-                
-                group_photos = []
-                for photo_row in self.database.cursor.fetchall():
-                    photo = dict(photo_row)
-                    if photo['exif_json']:
-                        import json
-                        try:
-                            photo['exif_data'] = json.loads(photo['exif_json'])
-                        except json.JSONDecodeError:
-                            photo['exif_data'] = {}
-                    else:
-                        photo['exif_data'] = {}
-                    group_photos.append(photo)
+            # 一次自连接查询取出所有重复组中的照片，按组排序后在Python中分组；
+            # 子查询按 (size, md5) 索引顺序扫描分组，无需临时排序
+            with self.database.read_connection() as connection:
+                cursor = connection.execute('''
+                    SELECT p.* FROM photos p
+                    JOIN (
+                        SELECT md5, size FROM photos
+                        WHERE is_deleted = 0
+                        GROUP BY md5, size
+                        HAVING COUNT(*) > 1
+                    ) d ON p.md5 = d.md5 AND p.size = d.size
+                    WHERE p.is_deleted = 0
+                    ORDER BY p.md5, p.size, p.imported_at
+                ''')
                 
-                if len(group_photos) > 1:
-                    duplicate_groups.append(group_photos)
-            
-            return duplicate_groups
+                photos = _iter_photos(cursor)
+                return [
+                    list(group_photos)
+                    for _, group_photos in groupby(photos, key=itemgetter('md5', 'size'))
+                ]
             
         except Exception as e:
             print(f"获取重复照片失败: {e}")
@@ -338,32 +471,27 @@ class DAOManager:
         Returns:
             照片列表
         """
+        return list(self.iter_photos_without_thumbnails())
+    
+    def iter_photos_without_thumbnails(self) -> Iterator[Dict]:
+        """
+        逐条产出没有缩略图的照片，供批量补生成缩略图时边查询边处理
+        
+        Yields:
+            照片字典
+        """
         try:
-            self.database.cursor.execute('''
-                SELECT * FROM photos 
-                WHERE (thumbnail_path IS NULL OR thumbnail_path = '') 
-                AND is_deleted = 0
-                ORDER BY imported_at DESC
-            ''')
-            
-            photos = []
-            for row in self.database.cursor.fetchall():
-                photo = dict(row)
-                if photo['exif_json']:
-                    import json
-                    try:
-                        photo['exif_data'] = json.loads(photo['exif_json'])
-                    except json.JSONDecodeError:
-                        photo['exif_data'] = {}
-                else:
-                    photo['exif_data'] = {}
-                photos.append(photo)
-            
-            return photos
+            with self.database.read_connection() as connection:
+                with closing(connection.execute('''
+                    SELECT * FROM photos 
+                    WHERE (thumbnail_path IS NULL OR thumbnail_path = '') 
+                    AND is_deleted = 0
+                    ORDER BY imported_at DESC
+                ''')) as cursor:
+                    yield from _iter_photos(cursor)
             
         except Exception as e:
             print(f"获取无缩略图照片失败: {e}")
-            return []
     
     def __enter__(self):
         """上下文管理器入口"""
@@ -7,13 +7,295 @@
 
 import sqlite3
 import os
-from typing import Optional, Dict, List, Any
-from datetime import datetime
+import threading
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Dict, List, Any, Set, Tuple, Iterator
+from datetime import datetime, date, timedelta
+
+
+# 每次建立连接后执行的性能相关PRAGMA
+# WAL + NORMAL使大多数提交只追加写WAL文件、不再逐事务fsync，读操作也不会阻塞写入；
+# 代价是系统崩溃或断电时可能丢失最后几个已提交的事务，但数据库文件不会损坏。
+# 较大的页缓存（64MB）和mmap加速浏览查询
+# busy_timeout 让导入线程和界面同时访问数据库时等待锁释放，而不是立即报 "database is locked"
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 60000",
+)
+
+# 只读连接的PRAGMA：禁止写入，页缓存比主连接小，其余与主连接一致
+READER_PRAGMAS = (
+    "PRAGMA query_only = ON",
+    "PRAGMA cache_size = -16384",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 60000",
+)
+
+# 空闲时保留的只读连接数上限
+READ_POOL_SIZE = 4
+
+# 流式读取时每次从SQLite取出的行数
+STREAM_FETCH_ROWS = 1000
+
+# 内存数据库没有磁盘文件，WAL和mmap对其无意义
+MEMORY_DB_SKIPPED_PRAGMAS = frozenset((
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA mmap_size = 268435456",
+))
+
+
+# 数据库表结构，初始化时通过 executescript 一次执行
+SCHEMA_SQL = '''
+    -- 照片表
+    CREATE TABLE IF NOT EXISTS photos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        filename TEXT NOT NULL,
+        path TEXT NOT NULL UNIQUE,
+        md5 TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        created_at TEXT,
+        imported_at TEXT NOT NULL,
+        type TEXT NOT NULL,
+        exif_json TEXT,
+        thumbnail_path TEXT,
+        is_deleted INTEGER DEFAULT 0,
+        updated_at TEXT,
+        UNIQUE(md5, size)
+    );
+
+    -- 配置表
+    CREATE TABLE IF NOT EXISTS config (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    );
+
+    -- 标签表（为将来扩展预留）
+    CREATE TABLE IF NOT EXISTS tags (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL UNIQUE,
+        color TEXT DEFAULT '#007ACC',
+        created_at TEXT NOT NULL
+    );
+
+    -- 照片标签关联表
+    CREATE TABLE IF NOT EXISTS photo_tags (
+        photo_id INTEGER,
+        tag_id INTEGER,
+        created_at TEXT NOT NULL,
+        PRIMARY KEY (photo_id, tag_id),
+        FOREIGN KEY (photo_id) REFERENCES photos (id) ON DELETE CASCADE,
+        FOREIGN KEY (tag_id) REFERENCES tags (id) ON DELETE CASCADE
+    );
+
+    -- 相册表（为将来扩展预留）
+    CREATE TABLE IF NOT EXISTS albums (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        description TEXT,
+        cover_photo_id INTEGER,
+        created_at TEXT NOT NULL,
+        FOREIGN KEY (cover_photo_id) REFERENCES photos (id)
+    );
+
+    -- 相册照片关联表
+    CREATE TABLE IF NOT EXISTS album_photos (
+        album_id INTEGER,
+        photo_id INTEGER,
+        added_at TEXT NOT NULL,
+        PRIMARY KEY (album_id, photo_id),
+        FOREIGN KEY (album_id) REFERENCES albums (id) ON DELETE CASCADE,
+        FOREIGN KEY (photo_id) REFERENCES photos (id) ON DELETE CASCADE
+    );
+'''
+
+
+# 照片计数（config表中的photo_count）由触发器在写入照片的同一事务中增量维护，
+# 无需每次导入后重新COUNT全表并单独提交一次
+PHOTO_COUNT_TRIGGERS = (
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_photos_count_insert
+    AFTER INSERT ON photos WHEN NEW.is_deleted = 0
+    BEGIN
+        UPDATE config SET value = CAST(value AS INTEGER) + 1 WHERE key = 'photo_count';
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_photos_count_delete
+    AFTER DELETE ON photos WHEN OLD.is_deleted = 0
+    BEGIN
+        UPDATE config SET value = CAST(value AS INTEGER) - 1 WHERE key = 'photo_count';
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_photos_count_soft_delete
+    AFTER UPDATE OF is_deleted ON photos
+    WHEN (OLD.is_deleted = 0) != (NEW.is_deleted = 0)
+    BEGIN
+        UPDATE config
+        SET value = CAST(value AS INTEGER) + (CASE WHEN NEW.is_deleted = 0 THEN 1 ELSE -1 END)
+        WHERE key = 'photo_count';
+    END
+    ''',
+)
+
+
+# 文件名全文索引：外部内容FTS5表只保存索引、不复制文件名，trigram分词器
+# 使 filename LIKE '%xxx%' 这类前导通配的子串搜索也能走索引（SQLite 3.34+）
+FILENAME_FTS_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS photos_fts USING fts5("
+    "filename, content='photos', content_rowid='id', tokenize='trigram')"
+)
+
+# 照片增删和改名时同步文件名全文索引
+FILENAME_FTS_TRIGGERS = (
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_photos_fts_insert
+    AFTER INSERT ON photos
+    BEGIN
+        INSERT INTO photos_fts(rowid, filename) VALUES (NEW.id, NEW.filename);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_photos_fts_delete
+    AFTER DELETE ON photos
+    BEGIN
+        INSERT INTO photos_fts(photos_fts, rowid, filename) VALUES ('delete', OLD.id, OLD.filename);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_photos_fts_update
+    AFTER UPDATE OF filename ON photos
+    BEGIN
+        INSERT INTO photos_fts(photos_fts, rowid, filename) VALUES ('delete', OLD.id, OLD.filename);
+        INSERT INTO photos_fts(rowid, filename) VALUES (NEW.id, NEW.filename);
+    END
+    ''',
+)
+
+
+# 只服务于浏览和搜索的二级索引：(索引名, 建索引SQL)
+# 导入去重依赖的 UNIQUE(md5, size) 和 idx_photos_size_md5 不在其中
+SECONDARY_INDEXES = (
+    # 按创建时间的查询都只针对未删除的照片，使用部分索引
+    ("idx_photos_created_at_live",
+     "CREATE INDEX IF NOT EXISTS idx_photos_created_at_live "
+     "ON photos(created_at) WHERE is_deleted = 0"),
+    # 最近导入、搜索结果都按导入时间倒序取前N条，可直接倒序扫描此索引
+    ("idx_photos_imported_at_live",
+     "CREATE INDEX IF NOT EXISTS idx_photos_imported_at_live "
+     "ON photos(imported_at) WHERE is_deleted = 0"),
+    ("idx_photos_filename",
+     "CREATE INDEX IF NOT EXISTS idx_photos_filename ON photos(filename)"),
+    # 供不区分大小写的文件名前缀搜索使用
+    ("idx_photos_filename_nocase",
+     "CREATE INDEX IF NOT EXISTS idx_photos_filename_nocase "
+     "ON photos(filename COLLATE NOCASE)"),
+    # 按类型浏览只针对未删除的照片并按导入时间倒序，复合部分索引同时满足过滤和排序
+    ("idx_photos_type_live",
+     "CREATE INDEX IF NOT EXISTS idx_photos_type_live "
+     "ON photos(type, imported_at) WHERE is_deleted = 0"),
+    # 只包含缺少缩略图的未删除照片，按导入时间排序，供补生成缩略图时直接顺序扫描
+    ("idx_photos_thumbnail_missing",
+     "CREATE INDEX IF NOT EXISTS idx_photos_thumbnail_missing ON photos(imported_at) "
+     "WHERE (thumbnail_path IS NULL OR thumbnail_path = '') AND is_deleted = 0"),
+)
+
+
+# 批量写入照片时每个事务包含的最大行数
+PHOTO_COMMIT_BATCH_ROWS = 10000
+
+
+# 单次批量导入超过此行数后执行 PRAGMA optimize 更新统计信息
+OPTIMIZE_AFTER_ROWS = 1000
+
+
+# 按数据库文件缓存的共享连接，见 Database.get_or_create
+_connection_cache: Dict[str, 'Database'] = {}
+_connection_cache_lock = threading.Lock()
+
+# INSERT/DELETE ... RETURNING 需要 SQLite 3.35 及以上
+SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# 新建数据库文件的页大小（字节），已有数据库保持原页大小
+SQLITE_PAGE_SIZE = 16384
+
+# 每个连接缓存的已编译SQL语句数量
+SQLITE_CACHED_STATEMENTS = 256
+
+
+def day_after(date_str: str) -> str:
+    """
+    返回YYYY-MM-DD格式日期的后一天
+    created_at 为ISO文本，"DATE(created_at) <= 结束日期" 等价于 "created_at < 结束日期的后一天"，
+    后者可以使用created_at索引
+    """
+    return (date.fromisoformat(date_str) + timedelta(days=1)).isoformat()
+
+
+def _close_connections(connection: sqlite3.Connection,
+                       read_pool: List[sqlite3.Connection]) -> None:
+    """Database实例被回收或解释器退出时仍未关闭的连接，由weakref.finalize调用此函数关闭"""
+    for reader in read_pool:
+        reader.close()
+    read_pool.clear()
+    connection.close()
 
 
 class Database:
     """数据库操作类"""
     
+    # 热点SQL语句保持文本固定，sqlite3按SQL文本缓存已编译的语句，可在调用间复用
+    # 路径或MD5+大小冲突的照片由SQLite直接跳过，不产生异常；
+    # 与 INSERT OR IGNORE 不同，缺少必填字段等其他约束错误仍会报告
+    # 未提供导入时间（imported_at 为None）时由SQLite取当前本地时间，格式与 datetime.isoformat 兼容
+    INSERT_PHOTO_SQL = '''
+        INSERT INTO photos (
+            filename, path, md5, size, created_at, imported_at,
+            type, exif_json, thumbnail_path
+        ) VALUES (
+            ?, ?, ?, ?, ?, COALESCE(?, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')),
+            ?, ?, ?
+        )
+        ON CONFLICT DO NOTHING
+    '''
+    
+    # 插入成功时返回新记录ID，冲突时不返回任何行
+    INSERT_PHOTO_RETURNING_SQL = INSERT_PHOTO_SQL.rstrip() + " RETURNING id"
+    
+    GET_CONFIG_SQL = "SELECT value FROM config WHERE key = ?"
+    
+    SET_CONFIG_SQL = (
+        "INSERT OR REPLACE INTO config (key, value, updated_at) VALUES (?, ?, ?)"
+    )
+    
+    PHOTO_COUNT_SQL = "SELECT COUNT(*) as count FROM photos WHERE is_deleted = 0"
+    
+    PHOTO_KEYS_SQL = "SELECT size, md5 FROM photos"
+    
+    PHOTO_EXISTS_SQL = (
+        "SELECT 1 FROM photos WHERE size = ? AND md5 = ? AND is_deleted = 0 LIMIT 1"
+    )
+    
+    SIZE_EXISTS_SQL = (
+        "SELECT 1 FROM photos WHERE size = ? AND is_deleted = 0 LIMIT 1"
+    )
+    
+    # 一次扫描得到按类型的数量、大小和最新导入时间，总计在Python中汇总
+    LIBRARY_STATS_SQL = '''
+        SELECT type, COUNT(*) as count, SUM(size) as total_size, MAX(imported_at) as latest
+        FROM photos
+        WHERE is_deleted = 0
+        GROUP BY type
+    '''
+    
     def __init__(self, db_path: str):
         """
         初始化数据库连接
@@ -24,6 +306,62 @@ class Database:
         self.db_path = db_path
         self.connection: Optional[sqlite3.Connection] = None
         self.cursor: Optional[sqlite3.Cursor] = None
+        # 文件名全文索引是否可用，initialize 时确定；SQLite未编译FTS5或版本过旧时为False
+        self.has_filename_fts = False
+        # 每次通过本类写入config表时递增，供上层配置缓存判断是否需要重新加载
+        self.config_generation = 0
+        # 共享连接可能被多个线程使用；WAL下读可并发，写操作需串行执行
+        self.write_lock = threading.RLock()
+        # 空闲的只读连接，见 read_connection
+        self._read_pool: List[sqlite3.Connection] = []
+        self._read_pool_lock = threading.Lock()
+        self._finalizer: Optional[weakref.finalize] = None
+        # 统计信息缓存及其对应的数据库版本，见 get_library_stats
+        self._stats_cache: Optional[Dict[str, Any]] = None
+        self._stats_cache_version: Optional[Tuple[int, int]] = None
+    
+    @classmethod
+    def get_or_create(cls, db_path: str) -> 'Database':
+        """
+        获取指定数据库文件的共享实例（已连接、PRAGMA已执行）
+        同一文件的多次调用返回同一个实例，避免反复打开连接、重新解析表结构
+        
+        Args:
+            db_path: 数据库文件路径
+            
+        Returns:
+            Database实例；内存数据库每次返回新实例
+        """
+        if db_path == ':memory:':
+            database = cls(db_path)
+            database.connect()
+            return database
+        
+        key = os.path.abspath(db_path)
+        with _connection_cache_lock:
+            database = _connection_cache.get(key)
+            if database is None:
+                database = cls(db_path)
+                _connection_cache[key] = database
+        
+        # 连接可能已被显式关闭，此时重新打开
+        database.connect()
+        return database
+    
+    @classmethod
+    def release_shared(cls, db_path: str) -> None:
+        """
+        关闭并移除指定数据库文件的共享实例
+        
+        Args:
+            db_path: 数据库文件路径
+        """
+        with _connection_cache_lock:
+            database = _connection_cache.pop(os.path.abspath(db_path), None)
+        
+        if database is not None:
+            with database.write_lock:
+                database.close()
     
     def connect(self) -> bool:
         """
@@ -32,19 +370,105 @@ class Database:
         Returns:
             是否连接成功
         """
+        # 已连接时直接复用，避免重复打开连接并重复执行PRAGMA
+        if self.connection is not None:
+            return True
+        
         try:
-            self.connection = sqlite3.connect(self.db_path)
+            # 扩大每个连接的已编译语句缓存（默认128条）
+            # 共享实例会在导入线程中使用，写操作由 write_lock 串行化
+            self.connection = sqlite3.connect(
+                self.db_path,
+                cached_statements=SQLITE_CACHED_STATEMENTS,
+                check_same_thread=False
+            )
+            # 未显式调用close时，实例被回收或解释器退出时仍会关闭连接
+            self._finalizer = weakref.finalize(
+                self, _close_connections, self.connection, self._read_pool
+            )
             self.connection.row_factory = sqlite3.Row  # 使结果可以按列名访问
             self.cursor = self.connection.cursor()
             
             # 启用外键约束
             self.cursor.execute("PRAGMA foreign_keys = ON")
             
+            # 页大小和auto_vacuum只能在写入数据库头之前设置，因此只对新建的空文件、且在切换WAL之前执行；
+            # 照片库以批量追加和整表统计扫描为主，较大的页可降低B树层数、提高扫描吞吐
+            if self.cursor.execute("PRAGMA page_count").fetchone()[0] == 0:
+                self.cursor.execute(f"PRAGMA page_size = {SQLITE_PAGE_SIZE}")
+                # 增量回收空间，删除照片后可用 PRAGMA incremental_vacuum 归还空闲页
+                self.cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            
+            in_memory = self.db_path == ':memory:'
+            for pragma in CONNECTION_PRAGMAS:
+                if in_memory and pragma in MEMORY_DB_SKIPPED_PRAGMAS:
+                    continue
+                self.cursor.execute(pragma)
+            
             return True
         except sqlite3.Error as e:
             print(f"数据库连接失败: {e}")
+            self.close()
             return False
     
+    @contextmanager
+    def read_connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        借用一个只读连接执行查询，用完自动归还
+        WAL模式下只读连接读取最近一次提交的快照，不会被主连接上正在进行的导入写入阻塞；
+        看不到主连接尚未提交的修改。内存数据库或只读连接打开失败时持写锁借用主连接
+        
+        Yields:
+            sqlite3.Connection: 只读连接
+        """
+        with self._read_pool_lock:
+            connection = self._read_pool.pop() if self._read_pool else None
+        
+        if connection is None:
+            connection = self._open_reader()
+            if connection is None:
+                # 主连接与导入线程等共享，借用期间持写锁，避免查询与其他线程的写入交错
+                self.connect()
+                with self.write_lock:
+                    yield self.connection
+                return
+        
+        try:
+            yield connection
+        finally:
+            with self._read_pool_lock:
+                if len(self._read_pool) < READ_POOL_SIZE:
+                    self._read_pool.append(connection)
+                    connection = None
+            if connection is not None:
+                connection.close()
+    
+    def _open_reader(self) -> Optional[sqlite3.Connection]:
+        """
+        打开一个只读连接
+        
+        Returns:
+            只读连接，内存数据库或打开失败时返回None
+        """
+        if self.db_path == ':memory:':
+            return None
+        
+        try:
+            uri = Path(os.path.abspath(self.db_path)).as_uri() + '?mode=ro'
+            connection = sqlite3.connect(
+                uri,
+                uri=True,
+                cached_statements=SQLITE_CACHED_STATEMENTS,
+                check_same_thread=False
+            )
+            connection.row_factory = sqlite3.Row
+            for pragma in READER_PRAGMAS:
+                connection.execute(pragma)
+            return connection
+        except sqlite3.Error as e:
+            print(f"打开只读连接失败: {e}")
+            return None
+    
     def initialize(self) -> bool:
         """
         初始化数据库表结构
@@ -56,86 +480,26 @@ class Database:
             return False
         
         try:
-            # 创建照片表
-            self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS photos (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    filename TEXT NOT NULL,
-                    path TEXT NOT NULL UNIQUE,
-                    md5 TEXT NOT NULL,
-                    size INTEGER NOT NULL,
-                    created_at TEXT,
-                    imported_at TEXT NOT NULL,
-                    type TEXT NOT NULL,
-                    exif_json TEXT,
-                    thumbnail_path TEXT,
-                    is_deleted INTEGER DEFAULT 0,
-                    UNIQUE(md5, size)
-                )
-            ''')
-            
-            # 创建配置表
-            self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS config (
-                    key TEXT PRIMARY KEY,
-                    value TEXT NOT NULL,
-                    updated_at TEXT NOT NULL
-                )
-            ''')
-            
-            # 创建标签表（为将来扩展预留）
-            self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS tags (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL UNIQUE,
-                    color TEXT DEFAULT '#007ACC',
-                    created_at TEXT NOT NULL
-                )
-            ''')
-            
-            # 创建照片标签关联表
-            self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS photo_tags (
-                    photo_id INTEGER,
-                    tag_id INTEGER,
-                    created_at TEXT NOT NULL,
-                    PRIMARY KEY (photo_id, tag_id),
-                    FOREIGN KEY (photo_id) REFERENCES photos (id) ON DELETE CASCADE,
-                    FOREIGN KEY (tag_id) REFERENCES tags (id) ON DELETE CASCADE
-                )
-            ''')
-            
-            # 创建相册表（为将来扩展预留）
-            self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS albums (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    description TEXT,
-                    cover_photo_id INTEGER,
-                    created_at TEXT NOT NULL,
-                    FOREIGN KEY (cover_photo_id) REFERENCES photos (id)
-                )
-            ''')
-            
-            # 创建相册照片关联表
-            self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS album_photos (
-                    album_id INTEGER,
-                    photo_id INTEGER,
-                    added_at TEXT NOT NULL,
-                    PRIMARY KEY (album_id, photo_id),
-                    FOREIGN KEY (album_id) REFERENCES albums (id) ON DELETE CASCADE,
-                    FOREIGN KEY (photo_id) REFERENCES photos (id) ON DELETE CASCADE
-                )
-            ''')
+            # 所有表结构一次提交给SQLite执行
+            self.cursor.executescript(SCHEMA_SQL)
+            self._migrate_photos_table()
             
             # 创建索引以提高查询性能
             self._create_indexes()
             
+            # 由触发器维护照片计数
+            self._create_triggers()
+            
+            self._create_filename_fts()
+            
             # 插入初始配置
             self._insert_initial_config()
             
+            # 触发器只处理增量，启动时按实际行数校准一次（兼容建触发器之前的数据库）
+            self._update_photo_count()
+            
             self.connection.commit()
+            self.config_generation += 1
             print("数据库初始化完成")
             return True
             
@@ -145,33 +509,103 @@ class Database:
                 self.connection.rollback()
             return False
     
+    def _migrate_photos_table(self) -> None:
+        """为旧版本创建的照片表补充缺少的列"""
+        columns = {row['name'] for row in self.cursor.execute("PRAGMA table_info(photos)")}
+        if 'updated_at' not in columns:
+            self.cursor.execute("ALTER TABLE photos ADD COLUMN updated_at TEXT")
+    
     def _create_indexes(self) -> None:
         """创建数据库索引"""
+        self._create_essential_indexes()
+        self.create_secondary_indexes()
+    
+    def _create_essential_indexes(self) -> None:
+        """创建导入过程中也必须存在的索引，并清理旧版本遗留的索引"""
         indexes = [
-            "CREATE INDEX IF NOT EXISTS idx_photos_md5 ON photos(md5)",
-            "CREATE INDEX IF NOT EXISTS idx_photos_created_at ON photos(created_at)",
-            "CREATE INDEX IF NOT EXISTS idx_photos_type ON photos(type)",
-            "CREATE INDEX IF NOT EXISTS idx_photos_is_deleted ON photos(is_deleted)",
-            "CREATE INDEX IF NOT EXISTS idx_config_key ON config(key)"
+            # 以下索引已被取代，升级旧数据库时删除：
+            # idx_photos_md5 是 UNIQUE(md5, size) 自动索引的前缀；
+            # idx_photos_is_deleted 区分度极低，反而诱使规划器放弃更好的索引；
+            # idx_config_key 与config表主键重复
+            "DROP INDEX IF EXISTS idx_photos_md5",
+            "DROP INDEX IF EXISTS idx_photos_is_deleted",
+            "DROP INDEX IF EXISTS idx_config_key",
+            # (size, md5) 复合索引同时服务于导入时的大小预筛和MD5+大小去重，
+            # 取代早期版本中单列的 idx_photos_size
+            "DROP INDEX IF EXISTS idx_photos_size",
+            "CREATE INDEX IF NOT EXISTS idx_photos_size_md5 ON photos(size, md5)",
+            # 按创建时间的查询都只针对未删除的照片，改用部分索引
+            # idx_photos_created_at_live，取代早期版本中覆盖全表的 idx_photos_created_at
+            "DROP INDEX IF EXISTS idx_photos_created_at",
+            # 由部分复合索引 idx_photos_type_live 取代
+            "DROP INDEX IF EXISTS idx_photos_type",
         ]
         
         for index_sql in indexes:
             self.cursor.execute(index_sql)
     
+    def create_secondary_indexes(self) -> None:
+        """创建只服务于浏览和搜索的二级索引（不提交）"""
+        for _, index_sql in SECONDARY_INDEXES:
+            self.cursor.execute(index_sql)
+    
+    def drop_secondary_indexes(self) -> None:
+        """
+        删除二级索引（不提交）
+        大批量导入前调用，导入完成后用 create_secondary_indexes 一次性重建，
+        比逐行维护所有索引更快
+        """
+        for index_name, _ in SECONDARY_INDEXES:
+            self.cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+    
+    def _create_triggers(self) -> None:
+        """创建在照片增删和软删除时同步更新 photo_count 配置的触发器"""
+        for trigger_sql in PHOTO_COUNT_TRIGGERS:
+            self.cursor.execute(trigger_sql)
+    
+    def _create_filename_fts(self) -> None:
+        """创建文件名全文索引及同步触发器（不提交），不支持时退回普通LIKE查询"""
+        self.cursor.execute("SAVEPOINT filename_fts")
+        try:
+            existed = self.cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'photos_fts'"
+            ).fetchone() is not None
+            self.cursor.execute(FILENAME_FTS_SQL)
+            for trigger_sql in FILENAME_FTS_TRIGGERS:
+                self.cursor.execute(trigger_sql)
+            if not existed:
+                # 为已有照片建立索引
+                self.cursor.execute("INSERT INTO photos_fts(photos_fts) VALUES ('rebuild')")
+            self.cursor.execute("RELEASE filename_fts")
+            self.has_filename_fts = True
+        except sqlite3.OperationalError as e:
+            self.cursor.execute("ROLLBACK TO filename_fts")
+            self.cursor.execute("RELEASE filename_fts")
+            self.has_filename_fts = False
+            print(f"文件名全文索引不可用，使用普通LIKE查询: {e}")
+    
+    def analyze(self) -> None:
+        """收集表和索引的统计信息，供查询规划器选择索引"""
+        try:
+            self.cursor.execute("ANALYZE")
+            self.connection.commit()
+        except sqlite3.Error as e:
+            print(f"收集统计信息失败: {e}")
+    
     def _insert_initial_config(self) -> None:
         """插入初始配置"""
+        now = datetime.now().isoformat()
         initial_configs = [
-            ("db_version", "1.0.0"),
-            ("created_at", datetime.now().isoformat()),
-            ("last_backup", ""),
-            ("photo_count", "0")
+            ("db_version", "1.0.0", now),
+            ("created_at", now, now),
+            ("last_backup", "", now),
+            ("photo_count", "0", now)
         ]
         
-        for key, value in initial_configs:
-            self.cursor.execute('''
-                INSERT OR IGNORE INTO config (key, value, updated_at)
-                VALUES (?, ?, ?)
-            ''', (key, value, datetime.now().isoformat()))
+        self.cursor.executemany('''
+            INSERT OR IGNORE INTO config (key, value, updated_at)
+            VALUES (?, ?, ?)
+        ''', initial_configs)
     
     def get_config(self, key: str, default: str = "") -> str:
         """
@@ -185,8 +619,8 @@ class Database:
             配置值
         """
         try:
-            self.cursor.execute("SELECT value FROM config WHERE key = ?", (key,))
-            result = self.cursor.fetchone()
+            # 读操作不持写锁，使用独立游标，避免与其他线程共用 self.cursor
+            result = self.connection.execute(self.GET_CONFIG_SQL, (key,)).fetchone()
             return result['value'] if result else default
         except sqlite3.Error as e:
             print(f"获取配置失败: {e}")
@@ -203,16 +637,17 @@ class Database:
         Returns:
             是否设置成功
         """
-        try:
-            self.cursor.execute('''
-                INSERT OR REPLACE INTO config (key, value, updated_at)
-                VALUES (?, ?, ?)
-            ''', (key, value, datetime.now().isoformat()))
-            self.connection.commit()
-            return True
-        except sqlite3.Error as e:
-            print(f"设置配置失败: {e}")
-            return False
+        with self.write_lock:
+            try:
+                self.cursor.execute(
+                    self.SET_CONFIG_SQL, (key, value, datetime.now().isoformat())
+                )
+                self.connection.commit()
+                self.config_generation += 1
+                return True
+            except sqlite3.Error as e:
+                print(f"设置配置失败: {e}")
+                return False
     
     def add_photo(self, photo_data: Dict[str, Any]) -> Optional[int]:
         """
@@ -222,41 +657,126 @@ class Database:
             photo_data: 照片数据字典
             
         Returns:
-            照片ID，失败返回None
+            照片ID，失败或照片已存在时返回None
         """
         try:
-            self.cursor.execute('''
-                INSERT INTO photos (
-                    filename, path, md5, size, created_at, imported_at,
-                    type, exif_json, thumbnail_path
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                photo_data['filename'],
-                photo_data['path'],
-                photo_data['md5'],
-                photo_data['size'],
-                photo_data.get('created_at'),
-                photo_data['imported_at'],
-                photo_data['type'],
-                photo_data.get('exif_json'),
-                photo_data.get('thumbnail_path')
-            ))
-            
-            photo_id = self.cursor.lastrowid
-            self.connection.commit()
+            return self.add_photos_with_ids([photo_data])[0]
+        except sqlite3.Error:
+            return None
+    
+    def add_photos(self, photos_data: List[Dict[str, Any]]) -> int:
+        """
+        批量添加照片记录
+        记录按 PHOTO_COMMIT_BATCH_ROWS 条一个事务写入，已存在的照片（路径或MD5+大小冲突）会被忽略；
+        调用时已处于事务中则全部在该事务中写入，不提交也不回滚。
+        写入失败时回滚本次开启的事务（此前已提交的分段保留）并抛出 sqlite3.Error
+        
+        Args:
+            photos_data: 照片数据字典列表，字段同add_photo
             
-            # 更新照片计数
-            self._update_photo_count()
+        Returns:
+            实际插入的记录数
+        """
+        if not photos_data:
+            return 0
+        
+        rows = [(
+            photo_data['filename'],
+            photo_data['path'],
+            photo_data['md5'],
+            photo_data['size'],
+            photo_data.get('created_at'),
+            photo_data.get('imported_at'),
+            photo_data['type'],
+            photo_data.get('exif_json'),
+            photo_data.get('thumbnail_path')
+        ) for photo_data in photos_data]
+        
+        inserted = 0
+        with self.write_lock:
+            # 调用方已开启事务时全部并入其中，由调用方决定提交或回滚
+            owns_transaction = not self.connection.in_transaction
+            try:
+                # 超大批量分段提交，避免单个事务过久占用写锁、WAL文件无限增长
+                for start in range(0, len(rows), PHOTO_COMMIT_BATCH_ROWS):
+                    if owns_transaction:
+                        self.cursor.execute('BEGIN IMMEDIATE')
+                    # rowcount 只统计语句本身插入的行，不含触发器对config的更新
+                    self.cursor.executemany(
+                        self.INSERT_PHOTO_SQL,
+                        rows[start:start + PHOTO_COMMIT_BATCH_ROWS]
+                    )
+                    inserted += self.cursor.rowcount
+                    if owns_transaction:
+                        self.connection.commit()
+                
+            except sqlite3.Error as e:
+                print(f"批量添加照片失败: {e}")
+                if owns_transaction:
+                    self.connection.rollback()
+                raise
             
-            return photo_id
+            # 大批量导入后数据分布可能明显变化，让SQLite按需更新统计信息
+            if owns_transaction and inserted >= OPTIMIZE_AFTER_ROWS:
+                self.cursor.execute("PRAGMA optimize")
+        
+        return inserted
+    
+    def add_photos_with_ids(self, photos_data: List[Dict[str, Any]]) -> List[Optional[int]]:
+        """
+        批量添加照片记录并返回每条记录的ID
+        所有记录在同一个事务中写入并只提交一次，已存在的照片会被忽略；
+        调用时已处于事务中则直接在该事务中写入，不提交也不回滚。
+        写入失败时回滚本次开启的事务并抛出 sqlite3.Error，与“全部为已存在的照片”区分开
+        
+        Args:
+            photos_data: 照片数据字典列表，字段同add_photo
             
-        except sqlite3.IntegrityError:
-            # 重复照片
-            print(f"照片已存在: {photo_data['path']}")
-            return None
-        except sqlite3.Error as e:
-            print(f"添加照片失败: {e}")
-            return None
+        Returns:
+            与输入一一对应的照片ID列表，已存在而被忽略的记录为None
+        """
+        if not photos_data:
+            return []
+        
+        photo_ids: List[Optional[int]] = []
+        with self.write_lock:
+            # 调用方已开启事务时并入其中，由调用方决定提交或回滚
+            owns_transaction = not self.connection.in_transaction
+            try:
+                if owns_transaction:
+                    self.cursor.execute('BEGIN IMMEDIATE')
+                
+                # 被跳过的记录不会产生rowid，因此逐条执行以取得准确的ID；
+                # 所有语句共享同一个已编译语句和同一次提交
+                cursor = self.cursor
+                sql = self.INSERT_PHOTO_RETURNING_SQL if SQLITE_HAS_RETURNING else self.INSERT_PHOTO_SQL
+                for photo_data in photos_data:
+                    cursor.execute(sql, (
+                        photo_data['filename'],
+                        photo_data['path'],
+                        photo_data['md5'],
+                        photo_data['size'],
+                        photo_data.get('created_at'),
+                        photo_data.get('imported_at'),
+                        photo_data['type'],
+                        photo_data.get('exif_json'),
+                        photo_data.get('thumbnail_path')
+                    ))
+                    if SQLITE_HAS_RETURNING:
+                        row = cursor.fetchone()
+                        photo_ids.append(row[0] if row else None)
+                    else:
+                        photo_ids.append(cursor.lastrowid if cursor.rowcount == 1 else None)
+                
+                if owns_transaction:
+                    self.connection.commit()
+                return photo_ids
+                
+            except sqlite3.Error as e:
+                print(f"批量添加照片失败: {e}")
+                if owns_transaction:
+                    self.connection.rollback()
+                raise
     
     def photo_exists(self, md5: str, size: int) -> bool:
         """
@@ -270,19 +790,80 @@ class Database:
             是否存在
         """
         try:
-            self.cursor.execute(
-                "SELECT id FROM photos WHERE md5 = ? AND size = ? AND is_deleted = 0",
-                (md5, size)
-            )
-            return self.cursor.fetchone() is not None
+            return self.connection.execute(self.PHOTO_EXISTS_SQL, (size, md5)).fetchone() is not None
         except sqlite3.Error as e:
             print(f"检查照片存在性失败: {e}")
             return False
     
+    def size_exists(self, size: int) -> bool:
+        """
+        检查是否存在相同大小的照片（导入去重的预筛）
+        
+        Args:
+            size: 文件大小
+            
+        Returns:
+            是否存在相同大小的照片，查询出错时保守返回True
+        """
+        try:
+            return self.connection.execute(self.SIZE_EXISTS_SQL, (size,)).fetchone() is not None
+        except sqlite3.Error as e:
+            print(f"检查照片大小失败: {e}")
+            return True
+    
+    def get_photo_keys(self) -> Set[Tuple[int, str]]:
+        """
+        获取库中所有照片的 (大小, MD5)，供批量导入时在内存中去重
+        包含已软删除的记录，因为 UNIQUE(md5, size) 约束同样作用于它们
+        
+        Returns:
+            (大小, MD5) 集合
+        """
+        try:
+            return {(row[0], row[1]) for row in self.connection.execute(self.PHOTO_KEYS_SQL)}
+        except sqlite3.Error as e:
+            print(f"获取照片指纹失败: {e}")
+            raise
+    
     def get_library_stats(self) -> Dict[str, Any]:
         """
         获取照片库统计信息
         
+        Returns:
+            统计信息字典
+        """
+        try:
+            # 统计在只读连接上查询，看不到主连接未提交的修改，事务进行中不缓存
+            if self.connection.in_transaction:
+                self._stats_cache = None
+                return self._query_library_stats()
+            
+            # 本连接的累计修改行数和其他连接提交的数据版本都未变化时，数据库内容未变，
+            # 界面每次刷新可直接复用上次结果
+            version = (
+                self.connection.total_changes,
+                self.connection.execute("PRAGMA data_version").fetchone()[0]
+            )
+            if self._stats_cache is None or version != self._stats_cache_version:
+                self._stats_cache = self._query_library_stats()
+                self._stats_cache_version = version
+        except sqlite3.Error as e:
+            print(f"获取统计信息失败: {e}")
+            return {
+                "photos_count": 0,
+                "total_size": 0,
+                "types_count": {},
+                "latest_import": None
+            }
+        
+        stats = dict(self._stats_cache)
+        stats["types_count"] = dict(stats["types_count"])
+        return stats
+    
+    def _query_library_stats(self) -> Dict[str, Any]:
+        """
+        查询照片库统计信息（单次分组扫描）
+        
         Returns:
             统计信息字典
         """
@@ -293,61 +874,58 @@ class Database:
             "latest_import": None
         }
         
-        try:
-            # 照片总数
-            self.cursor.execute("SELECT COUNT(*) as count FROM photos WHERE is_deleted = 0")
-            result = self.cursor.fetchone()
-            stats["photos_count"] = result['count'] if result else 0
-            
-            # 总大小
-            self.cursor.execute("SELECT SUM(size) as total_size FROM photos WHERE is_deleted = 0")
-            result = self.cursor.fetchone()
-            stats["total_size"] = result['total_size'] if result and result['total_size'] else 0
-            
-            # 按类型统计
-            self.cursor.execute('''
-                SELECT type, COUNT(*) as count 
-                FROM photos 
-                WHERE is_deleted = 0 
-                GROUP BY type
-            ''')
-            for row in self.cursor.fetchall():
-                stats["types_count"][row['type']] = row['count']
-            
-            # 最新导入时间
-            self.cursor.execute('''
-                SELECT MAX(imported_at) as latest 
-                FROM photos 
-                WHERE is_deleted = 0
-            ''')
-            result = self.cursor.fetchone()
-            stats["latest_import"] = result['latest'] if result else None
-            
-        except sqlite3.Error as e:
-            print(f"获取统计信息失败: {e}")
+        with self.read_connection() as connection:
+            rows = connection.execute(self.LIBRARY_STATS_SQL).fetchall()
+        
+        latest = None
+        for row in rows:
+            stats["photos_count"] += row['count']
+            stats["total_size"] += row['total_size'] or 0
+            stats["types_count"][row['type']] = row['count']
+            if row['latest'] is not None and (latest is None or row['latest'] > latest):
+                latest = row['latest']
+        stats["latest_import"] = latest
         
         return stats
     
     def _update_photo_count(self) -> None:
-        """更新照片计数配置"""
-        try:
-            self.cursor.execute("SELECT COUNT(*) as count FROM photos WHERE is_deleted = 0")
-            result = self.cursor.fetchone()
-            count = result['count'] if result else 0
-            self.set_config("photo_count", str(count))
-        except sqlite3.Error as e:
-            print(f"更新照片计数失败: {e}")
+        """按实际未删除照片数校准 photo_count 配置（不提交，随所在事务一起提交）"""
+        self.cursor.execute('''
+            UPDATE config SET value = (SELECT COUNT(*) FROM photos WHERE is_deleted = 0)
+            WHERE key = 'photo_count'
+        ''')
     
     def close(self) -> None:
         """关闭数据库连接"""
+        if self._finalizer is not None:
+            self._finalizer.detach()
+            self._finalizer = None
+        
+        # 原地清空，连接池列表与finalize登记的是同一个对象
+        with self._read_pool_lock:
+            readers = self._read_pool[:]
+            self._read_pool.clear()
+        for reader in readers:
+            reader.close()
+        
         if self.cursor:
             self.cursor.close()
             self.cursor = None
         
         if self.connection:
+            # 关闭前让SQLite根据本次连接的查询情况更新统计信息
+            try:
+                self.connection.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass
             self.connection.close()
             self.connection = None
     
-    def __del__(self):
-        """析构函数"""
+    def __enter__(self):
+        """上下文管理器入口"""
+        self.connect()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器出口"""
         self.close()
\ No newline at end of file
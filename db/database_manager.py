@@ -4,10 +4,14 @@
 
 import sqlite3
 import os
-from typing import Optional, Dict, List, Any, Tuple
+from contextlib import closing
+from typing import Optional, Dict, List, Any, Set, Tuple, Iterator
 from datetime import datetime
-import json
-from .database import Database
+from itertools import groupby
+from operator import itemgetter
+from libs import fast_json
+from .database import Database, day_after, STREAM_FETCH_ROWS
+from .photo_dao import row_to_photo
 
 
 class DatabaseManager:
@@ -21,7 +25,8 @@ class DatabaseManager:
             db_path: 数据库文件路径
         """
         self.db_path = db_path
-        self.database = Database(db_path)
+        # 同一数据库文件的所有管理器共享一个已连接的Database实例
+        self.database = Database.get_or_create(db_path)
         
     def connect(self) -> bool:
         """连接数据库"""
@@ -44,6 +49,29 @@ class DatabaseManager:
         """
         return self.database.photo_exists(md5, size)
     
+    def photo_exists_by_size(self, size: int) -> bool:
+        """
+        检查是否已存在相同大小的照片
+        大小不同的文件不可能重复，可据此跳过哈希比对
+        
+        Args:
+            size: 文件大小（字节）
+            
+        Returns:
+            bool: 是否存在相同大小的照片
+        """
+        return self.database.size_exists(size)
+    
+    def get_existing_photo_keys(self) -> Set[Tuple[int, str]]:
+        """
+        一次性读取库中所有照片的 (大小, MD5)
+        批量导入时据此在内存中去重，无需每个文件查询一次数据库
+        
+        Returns:
+            Set[Tuple[int, str]]: (文件大小, MD5) 集合
+        """
+        return self.database.get_photo_keys()
+    
     def add_photo_record(self, 
                         filename: str,
                         relative_path: str,
@@ -75,14 +103,96 @@ class DatabaseManager:
             'md5': md5,
             'size': size,
             'created_at': created_at,
-            'imported_at': datetime.now().isoformat(),
             'type': photo_type,
-            'exif_json': json.dumps(exif_data) if exif_data else None,
+            'exif_json': fast_json.dumps(exif_data) if exif_data else None,
             'thumbnail_path': thumbnail_path
         }
         
+        # 单条写入走与批量相同的路径
         return self.database.add_photo(photo_data)
     
+    def add_photo_records(self, records: List[Dict[str, Any]]) -> int:
+        """
+        批量添加照片记录到数据库（单个事务），写入失败时抛出 sqlite3.Error
+        
+        Args:
+            records: 照片记录列表，每项的键与add_photo_record的参数相同
+            
+        Returns:
+            int: 实际插入的记录数
+        """
+        return self.database.add_photos(self._records_to_photo_data(records))
+    
+    def add_photo_records_with_ids(self, records: List[Dict[str, Any]]) -> List[Optional[int]]:
+        """
+        批量添加照片记录到数据库（单个事务），并返回每条记录的ID；写入失败时抛出 sqlite3.Error
+        
+        Args:
+            records: 照片记录列表，每项的键与add_photo_record的参数相同
+            
+        Returns:
+            List[Optional[int]]: 与输入一一对应的照片ID，已存在的记录为None
+        """
+        return self.database.add_photos_with_ids(self._records_to_photo_data(records))
+    
+    def _records_to_photo_data(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """将add_photo_record参数形式的记录转换为照片表字段，同一批记录共用一个导入时间"""
+        imported_at = datetime.now().isoformat()
+        photos_data = []
+        
+        for record in records:
+            exif_data = record.get('exif_data')
+            photos_data.append({
+                'filename': record['filename'],
+                'path': record['relative_path'],
+                'md5': record['md5'],
+                'size': record['size'],
+                'created_at': record.get('created_at'),
+                'imported_at': imported_at,
+                'type': record.get('photo_type', 'jpg'),
+                'exif_json': fast_json.dumps(exif_data) if exif_data else None,
+                'thumbnail_path': record.get('thumbnail_path')
+            })
+        
+        return photos_data
+    
+    def begin_bulk_import(self) -> bool:
+        """
+        开始大批量导入：删除二级索引，导入期间只维护去重所需的索引
+        必须与 end_bulk_import 成对调用
+        
+        Returns:
+            bool: 是否成功
+        """
+        with self.database.write_lock:
+            try:
+                self.database.drop_secondary_indexes()
+                self.database.connection.commit()
+                return True
+            except sqlite3.Error as e:
+                print(f"删除二级索引失败: {e}")
+                self.database.connection.rollback()
+                return False
+    
+    def end_bulk_import(self) -> bool:
+        """
+        结束大批量导入：一次性重建二级索引并更新统计信息
+        
+        Returns:
+            bool: 是否成功
+        """
+        with self.database.write_lock:
+            try:
+                self.database.create_secondary_indexes()
+                self.database.connection.commit()
+            except sqlite3.Error as e:
+                print(f"重建二级索引失败: {e}")
+                self.database.connection.rollback()
+                return False
+            
+            self.database.analyze()
+            return True
+    
     def get_photos_by_date_range(self, start_date: str, end_date: str) -> List[Dict]:
         """
         获取指定日期范围内的照片
@@ -94,20 +204,7 @@ class DatabaseManager:
         Returns:
             List[Dict]: 照片记录列表
         """
-        try:
-            self.database.cursor.execute('''
-                SELECT * FROM photos 
-                WHERE DATE(created_at) BETWEEN ? AND ? 
-                AND is_deleted = 0
-                ORDER BY created_at DESC
-            ''', (start_date, end_date))
-            
-            columns = [description[0] for description in self.database.cursor.description]
-            return [dict(zip(columns, row)) for row in self.database.cursor.fetchall()]
-            
-        except sqlite3.Error as e:
-            print(f"查询照片失败: {e}")
-            return []
+        return self._photos_in_range(start_date, day_after(end_date))
     
     def get_photos_by_month(self, year: int, month: int) -> List[Dict]:
         """
@@ -125,20 +222,35 @@ class DatabaseManager:
             end_date = f"{year+1:04d}-01-01"
         else:
             end_date = f"{year:04d}-{month+1:02d}-01"
+        
+        return self._photos_in_range(start_date, end_date)
+    
+    def _photos_in_range(self, start: str, end_before: str) -> List[Dict]:
+        """
+        获取创建时间在半开区间 [start, end_before) 内的照片
+        直接比较created_at文本而不包装DATE()，可以使用created_at索引做范围扫描
+        
+        Args:
+            start: 起始时间（含，ISO格式）
+            end_before: 结束时间（不含，ISO格式）
             
+        Returns:
+            List[Dict]: 照片记录列表
+        """
         try:
-            self.database.cursor.execute('''
-                SELECT * FROM photos 
-                WHERE created_at >= ? AND created_at < ? 
-                AND is_deleted = 0
-                ORDER BY created_at DESC
-            ''', (start_date, end_date))
-            
-            columns = [description[0] for description in self.database.cursor.description]
-            return [dict(zip(columns, row)) for row in self.database.cursor.fetchall()]
+            with self.database.read_connection() as connection:
+                cursor = connection.execute('''
+                    SELECT * FROM photos 
+                    WHERE created_at >= ? AND created_at < ? 
+                    AND is_deleted = 0
+                    ORDER BY created_at DESC
+                ''', (start, end_before))
+                
+                # 行对象已可按列名访问，直接转为字典，无需读取description再zip
+                return [dict(row) for row in cursor.fetchall()]
             
         except sqlite3.Error as e:
-            print(f"查询月份照片失败: {e}")
+            print(f"查询照片失败: {e}")
             return []
     
     def get_duplicate_photos(self) -> List[Tuple[str, int, List[Dict]]]:
@@ -149,31 +261,26 @@ class DatabaseManager:
             List[Tuple]: (md5, size, photos_list) 的列表
         """
         try:
-            self.database.cursor.execute('''
-                SELECT md5, size, COUNT(*) as count
-                FROM photos 
-                WHERE is_deleted = 0
-                GROUP BY md5, size
-                HAVING count > 1
-            ''')
+            # 一次自连接查询取出所有重复组中的照片，按组排序后在Python中分组，
+            # 不再为每个重复组单独查询一次
+            with self.database.read_connection() as connection:
+                rows = connection.execute('''
+                    SELECT p.* FROM photos p
+                    JOIN (
+                        SELECT md5, size FROM photos
+                        WHERE is_deleted = 0
+                        GROUP BY md5, size
+                        HAVING COUNT(*) > 1
+                    ) d ON p.md5 = d.md5 AND p.size = d.size
+                    WHERE p.is_deleted = 0
+                    ORDER BY p.md5, p.size, p.imported_at
+                ''').fetchall()
             
-            duplicates = []
-            for row in self.database.cursor.fetchall():
-                md5, size, count = row
-                
-                # 获取具有相同MD5和大小的所有照片
-                self.database.cursor.execute('''
-                    SELECT * FROM photos 
-                    WHERE md5 = ? AND size = ? AND is_deleted = 0
-                    ORDER BY imported_at
-                ''', (md5, size))
-                
-                columns = [description[0] for description in self.database.cursor.description]
-                photos = [dict(zip(columns, photo_row)) for photo_row in self.database.cursor.fetchall()]
-                
-                duplicates.append((md5, size, photos))
-            
-            return duplicates
+            rows = (dict(row) for row in rows)
+            return [
+                (md5, size, list(photos))
+                for (md5, size), photos in groupby(rows, key=itemgetter('md5', 'size'))
+            ]
             
         except sqlite3.Error as e:
             print(f"查询重复照片失败: {e}")
@@ -190,19 +297,21 @@ class DatabaseManager:
         Returns:
             bool: 是否更新成功
         """
-        try:
-            self.database.cursor.execute('''
-                UPDATE photos 
-                SET thumbnail_path = ?, updated_at = ?
-                WHERE id = ?
-            ''', (thumbnail_path, datetime.now().isoformat(), photo_id))
-            
-            self.database.connection.commit()
-            return True
-            
-        except sqlite3.Error as e:
-            print(f"更新缩略图失败: {e}")
-            return False
+        with self.database.write_lock:
+            try:
+                self.database.cursor.execute('''
+                    UPDATE photos 
+                    SET thumbnail_path = ?, updated_at = ?
+                    WHERE id = ?
+                ''', (thumbnail_path, datetime.now().isoformat(), photo_id))
+                
+                self.database.connection.commit()
+                # 照片ID不存在时没有行被更新
+                return self.database.cursor.rowcount > 0
+                
+            except sqlite3.Error as e:
+                print(f"更新缩略图失败: {e}")
+                return False
     
     def delete_photo_record(self, photo_id: int) -> bool:
         """
@@ -214,19 +323,21 @@ class DatabaseManager:
         Returns:
             bool: 是否删除成功
         """
-        try:
-            self.database.cursor.execute('''
-                UPDATE photos 
-                SET is_deleted = 1, updated_at = ?
-                WHERE id = ?
-            ''', (datetime.now().isoformat(), photo_id))
-            
-            self.database.connection.commit()
-            return True
-            
-        except sqlite3.Error as e:
-            print(f"删除照片记录失败: {e}")
-            return False
+        with self.database.write_lock:
+            try:
+                self.database.cursor.execute('''
+                    UPDATE photos 
+                    SET is_deleted = 1, updated_at = ?
+                    WHERE id = ?
+                ''', (datetime.now().isoformat(), photo_id))
+                
+                self.database.connection.commit()
+                # 照片ID不存在时没有行被更新
+                return self.database.cursor.rowcount > 0
+                
+            except sqlite3.Error as e:
+                print(f"删除照片记录失败: {e}")
+                return False
     
     def get_library_statistics(self) -> Dict[str, Any]:
         """
@@ -237,43 +348,53 @@ class DatabaseManager:
         """
         return self.database.get_library_stats()
     
-    def get_all_photos(self):
+    def get_all_photos(self) -> List[Dict]:
         """获取所有照片记录"""
+        return list(self.iter_all_photos())
+    
+    def iter_all_photos(self) -> Iterator[Dict]:
+        """
+        逐条产出所有照片记录，大型照片库无需一次性载入全部记录
+        
+        Yields:
+            Dict: 照片记录，含解析后的 exif_data
+        """
         try:
             if not self.database.cursor:
                 self.connect()
-                
-            self.database.cursor.execute('''
-                SELECT id, filename, md5, size, created_at, path as relative_path, 
-                       type as photo_type, exif_json, imported_at, thumbnail_path
-                FROM photos
-                WHERE is_deleted = 0
-                ORDER BY created_at DESC
-            ''')
-            
-            photos = []
-            for row in self.database.cursor.fetchall():
-                photo = dict(row)
-                # 解析 exif_json 为 exif_data
-                if photo['exif_json']:
-                    try:
-                        import json
-                        photo['exif_data'] = json.loads(photo['exif_json'])
-                    except json.JSONDecodeError:
-                        photo['exif_data'] = {}
-                else:
-                    photo['exif_data'] = {}
-                photos.append(photo)
             
-            return photos
+            # 在只读连接上分批读取，导入写入期间也不阻塞
+            with self.database.read_connection() as connection, \
+                    closing(connection.cursor()) as cursor:
+                cursor.arraysize = STREAM_FETCH_ROWS
+                cursor.execute('''
+                    SELECT id, filename, md5, size, created_at, path as relative_path, 
+                           type as photo_type, exif_json, imported_at, thumbnail_path
+                    FROM photos
+                    WHERE is_deleted = 0
+                    ORDER BY created_at DESC
+                ''')
+                
+                while True:
+                    rows = cursor.fetchmany()
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield row_to_photo(row)
             
         except sqlite3.Error as e:
             print(f"查询所有照片失败: {e}")
-            return []
     
     def close(self):
-        """关闭数据库连接"""
-        self.database.close()
+        """
+        结束本管理器的使用
+        连接由同一数据库文件的所有管理器共享，此处不关闭；需要真正关闭时调用shutdown
+        """
+        pass
+    
+    def shutdown(self):
+        """关闭并释放该数据库文件的共享连接（如删除数据库文件前）"""
+        Database.release_shared(self.db_path)
     
     def __enter__(self):
         """上下文管理器入口"""
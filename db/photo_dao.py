@@ -6,14 +6,138 @@
 """
 
 import sqlite3
-import json
-from typing import Optional, Dict, List, Any, Tuple
+from collections.abc import Mapping
+from contextlib import closing
+from typing import Optional, Dict, List, Any, Tuple, Iterator
 from datetime import datetime
-from .database import Database
+from libs import fast_json
+from .database import Database, day_after, STREAM_FETCH_ROWS
+
+
+# 拼接在路径前缀之后作为范围上界，大于任何以该前缀开头的路径
+PATH_PREFIX_END = '\U0010ffff'
+
+
+def row_to_photo(row: sqlite3.Row) -> Dict:
+    """
+    将照片查询结果行转换为字典，并解析EXIF JSON为 exif_data
+    
+    Args:
+        row: 照片表查询结果行
+        
+    Returns:
+        照片字典，EXIF缺失或无法解析时 exif_data 为空字典
+    """
+    photo = dict(row)
+    photo['exif_data'] = _hydrate_exif(photo['exif_json'])
+    return photo
+
+
+def _hydrate_exif(exif_json: Optional[str]) -> Dict:
+    """
+    解析EXIF JSON文本
+    
+    Args:
+        exif_json: exif_json 列的值
+        
+    Returns:
+        EXIF字典，缺失或无法解析时为空字典
+    """
+    if exif_json:
+        try:
+            return fast_json.loads(exif_json)
+        except fast_json.JSONDecodeError:
+            pass
+    return {}
+
+
+class PhotoView(Mapping):
+    """
+    照片查询结果行的只读字典视图，由 PhotoDAO 的 iter_* 方法产出
+    直接按列名读取底层的 sqlite3.Row，不复制整行；exif_data 在首次访问时才解析，
+    只读取文件名、路径等少数字段的列表遍历无需为每行解析EXIF。
+    视图不可修改，也不是dict，需要修改、保存或序列化（json.dumps）时用 copy() 转为普通字典；
+    get_* 列表方法返回的已经是普通字典
+    """
+    
+    __slots__ = ('_row', '_exif')
+    
+    def __init__(self, row: sqlite3.Row):
+        """
+        Args:
+            row: 照片表查询结果行
+        """
+        self._row = row
+        self._exif = None
+    
+    def __getitem__(self, key: str) -> Any:
+        if key == 'exif_data':
+            if self._exif is None:
+                self._exif = _hydrate_exif(self['exif_json'])
+            return self._exif
+        try:
+            return self._row[key]
+        except IndexError:
+            # sqlite3.Row 对不存在的列抛出IndexError，转换为字典语义的KeyError
+            raise KeyError(key) from None
+    
+    def __iter__(self):
+        keys = self._row.keys()
+        yield from keys
+        if 'exif_json' in keys:
+            yield 'exif_data'
+    
+    def __len__(self) -> int:
+        keys = self._row.keys()
+        return len(keys) + ('exif_json' in keys)
+    
+    def __repr__(self) -> str:
+        return f"PhotoView({dict(self)!r})"
+    
+    def copy(self) -> Dict:
+        """返回包含全部列和 exif_data 的普通字典"""
+        return dict(self)
 
 
 class PhotoDAO:
-    """照片数据访问对象"""
+    """
+    照片数据访问对象
+    
+    读操作按类型固定使用的连接：
+    - 列表查询（get_* 列表方法、iter_* 迭代方法）都在只读连接池上执行，读取最近一次提交的快照，
+      同一查询的列表版本和迭代版本结果一致，且不受导入线程写事务的影响
+    - 按ID/MD5的单条查询和计数、统计在主连接上执行，能看到本连接刚写入、尚未提交的记录
+    """
+    
+    # 列表查询不需要EXIF时使用的列，省去读取和解析体积最大的 exif_json
+    PHOTO_COLUMNS = (
+        "id, filename, path, md5, size, created_at, imported_at, "
+        "type, thumbnail_path, is_deleted, updated_at"
+    )
+    
+    # 高频单条查询和写入的SQL，每次调用使用同一段文本以命中连接的已编译语句缓存
+    GET_PHOTO_BY_ID_SQL = "SELECT * FROM photos WHERE id = ? AND is_deleted = 0"
+    
+    GET_PHOTO_BY_MD5_SQL = (
+        "SELECT * FROM photos WHERE md5 = ? AND size = ? AND is_deleted = 0"
+    )
+    
+    SOFT_DELETE_PHOTO_SQL = "UPDATE photos SET is_deleted = 1 WHERE id = ?"
+    
+    DELETE_PHOTO_SQL = "DELETE FROM photos WHERE id = ?"
+    
+    # get_photos_stats 使用；MIN忽略NULL，无需额外过滤 created_at IS NOT NULL
+    PHOTOS_STATS_SQL = '''
+        SELECT type, COUNT(*) as count, SUM(size) as total_size,
+               MAX(imported_at) as latest, MIN(created_at) as oldest
+        FROM photos
+        WHERE is_deleted = 0
+        GROUP BY type
+    '''
+    
+    # update_photo 可更新的字段，按固定顺序生成SET子句，
+    # 相同字段组合无论传入顺序如何都得到同一段SQL
+    UPDATABLE_FIELDS = ('filename', 'path', 'thumbnail_path', 'type', 'exif_data')
     
     def __init__(self, database: Database):
         """
@@ -23,6 +147,8 @@ class PhotoDAO:
             database: 数据库实例
         """
         self.db = database
+        # update_photo 按更新字段组合缓存生成的SQL，每种组合只拼接一次
+        self._update_sql_cache: Dict[Tuple[str, ...], str] = {}
     
     def insert_photo(self, 
                     filename: str,
@@ -55,14 +181,125 @@ class PhotoDAO:
             'md5': md5,
             'size': size,
             'created_at': created_at,
-            'imported_at': datetime.now().isoformat(),
             'type': photo_type,
-            'exif_json': json.dumps(exif_data, ensure_ascii=False) if exif_data else None,
+            'exif_json': fast_json.dumps(exif_data) if exif_data else None,
             'thumbnail_path': thumbnail_path
         }
         
         return self.db.add_photo(photo_data)
     
+    def insert_photos(self, photos: List[Dict[str, Any]]) -> List[Optional[int]]:
+        """
+        在一个事务中批量插入照片记录，写入失败时抛出 sqlite3.Error
+        
+        Args:
+            photos: 照片字典列表，键与insert_photo的参数相同
+                （filename, path, md5, size, created_at, photo_type, exif_data, thumbnail_path）
+            
+        Returns:
+            与输入一一对应的照片ID列表，已存在的照片为None
+        """
+        # 同一批记录共用一个导入时间
+        imported_at = datetime.now().isoformat()
+        photos_data = []
+        for photo in photos:
+            exif_data = photo.get('exif_data')
+            photos_data.append({
+                'filename': photo['filename'],
+                'path': photo['path'],
+                'md5': photo['md5'],
+                'size': photo['size'],
+                'created_at': photo.get('created_at'),
+                'imported_at': imported_at,
+                'type': photo.get('photo_type', 'jpg'),
+                'exif_json': fast_json.dumps(exif_data) if exif_data else None,
+                'thumbnail_path': photo.get('thumbnail_path')
+            })
+        
+        return self.db.add_photos_with_ids(photos_data)
+    
+    def _select_columns(self, include_exif: bool) -> str:
+        """返回列表查询的SELECT列"""
+        return "*" if include_exif else self.PHOTO_COLUMNS
+    
+    # 以下SQL由列表方法和对应的迭代方法共用
+    def _recent_photos_sql(self, include_exif: bool) -> str:
+        """最近导入照片的查询SQL，参数为 (数量限制,)"""
+        return f'''
+            SELECT {self._select_columns(include_exif)} FROM photos 
+            WHERE is_deleted = 0 
+            ORDER BY imported_at DESC 
+            LIMIT ?
+        '''
+    
+    def _all_photos_sql(self, include_exif: bool) -> str:
+        """所有照片的查询SQL，无参数"""
+        exif_column = ", exif_json" if include_exif else ""
+        return f'''
+            SELECT id, filename, path as relative_path, md5, size, created_at, 
+                   imported_at, type, thumbnail_path, is_deleted{exif_column}
+            FROM photos 
+            WHERE is_deleted = 0 
+            ORDER BY imported_at DESC
+        '''
+    
+    def _date_range_sql(self, include_exif: bool) -> str:
+        """日期范围查询SQL，参数为 (开始日期, 结束日期的后一天)"""
+        # 半开区间直接比较created_at文本，不包装DATE()，可以使用created_at索引
+        return f'''
+            SELECT {self._select_columns(include_exif)} FROM photos 
+            WHERE created_at >= ? AND created_at < ? 
+            AND is_deleted = 0
+            ORDER BY created_at DESC
+        '''
+    
+    def _query_photos(self, sql: str, params: Tuple, include_exif: bool) -> List[Dict]:
+        """
+        在只读连接上执行列表查询并读取全部结果
+        
+        Args:
+            sql: 照片列表查询SQL
+            params: 查询参数
+            include_exif: 查询是否包含 exif_json，包含时解析为 exif_data
+            
+        Returns:
+            照片列表
+        """
+        with self.db.read_connection() as connection, \
+                closing(connection.cursor()) as cursor:
+            if include_exif:
+                cursor.execute(sql, params)
+                return [row_to_photo(row) for row in cursor.fetchall()]
+            
+            # 不含EXIF时取元组行，按列名直接组装字典，省去中间的 sqlite3.Row 对象
+            cursor.row_factory = None
+            cursor.execute(sql, params)
+            columns = [d[0] for d in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    
+    def _iter_query(self, sql: str, params: Tuple) -> Iterator[PhotoView]:
+        """
+        在只读连接上执行列表查询，分批取出结果逐条产出
+        
+        Args:
+            sql: 照片列表查询SQL
+            params: 查询参数
+            
+        Yields:
+            照片的只读字典视图，包含EXIF时 exif_data 在访问时才解析
+        """
+        # 使用独立游标，调用方边遍历边调用其他DAO方法也不会打断查询
+        with self.db.read_connection() as connection, \
+                closing(connection.cursor()) as cursor:
+            cursor.arraysize = STREAM_FETCH_ROWS
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                for row in rows:
+                    yield PhotoView(row)
+    
     def get_photo_by_id(self, photo_id: int) -> Optional[Dict]:
         """
         根据ID获取照片信息
@@ -74,24 +311,9 @@ class PhotoDAO:
             照片信息字典，不存在返回None
         """
         try:
-            self.db.cursor.execute('''
-                SELECT * FROM photos 
-                WHERE id = ? AND is_deleted = 0
-            ''', (photo_id,))
-            
-            row = self.db.cursor.fetchone()
-            if row:
-                photo = dict(row)
-                # 解析EXIF JSON数据
-                if photo['exif_json']:
-                    try:
-                        photo['exif_data'] = json.loads(photo['exif_json'])
-                    except json.JSONDecodeError:
-                        photo['exif_data'] = {}
-                else:
-                    photo['exif_data'] = {}
-                return photo
-            return None
+            # 读操作不持写锁，使用独立游标，避免与其他线程共用 db.cursor
+            row = self.db.connection.execute(self.GET_PHOTO_BY_ID_SQL, (photo_id,)).fetchone()
+            return row_to_photo(row) if row else None
             
         except sqlite3.Error as e:
             print(f"获取照片失败: {e}")
@@ -109,200 +331,169 @@ class PhotoDAO:
             照片信息字典，不存在返回None
         """
         try:
-            self.db.cursor.execute('''
-                SELECT * FROM photos 
-                WHERE md5 = ? AND size = ? AND is_deleted = 0
-            ''', (md5, size))
-            
-            row = self.db.cursor.fetchone()
-            if row:
-                photo = dict(row)
-                if photo['exif_json']:
-                    try:
-                        photo['exif_data'] = json.loads(photo['exif_json'])
-                    except json.JSONDecodeError:
-                        photo['exif_data'] = {}
-                else:
-                    photo['exif_data'] = {}
-                return photo
-            return None
+            row = self.db.connection.execute(self.GET_PHOTO_BY_MD5_SQL, (md5, size)).fetchone()
+            return row_to_photo(row) if row else None
             
         except sqlite3.Error as e:
             print(f"获取照片失败: {e}")
             return None
     
-    def get_recent_photos(self, limit: int = 20) -> List[Dict]:
+    def get_recent_photos(self, limit: int = 20, include_exif: bool = True) -> List[Dict]:
         """
         获取最近导入的照片
         
         Args:
             limit: 返回数量限制
+            include_exif: 是否读取并解析EXIF（exif_json、exif_data），只显示列表时可关闭
             
         Returns:
             照片列表
         """
         try:
-            self.db.cursor.execute('''
-                SELECT * FROM photos 
-                WHERE is_deleted = 0 
-                ORDER BY imported_at DESC 
-                LIMIT ?
-            ''', (limit,))
-            
-            photos = []
-            for row in self.db.cursor.fetchall():
-                photo = dict(row)
-                if photo['exif_json']:
-                    try:
-                        photo['exif_data'] = json.loads(photo['exif_json'])
-                    except json.JSONDecodeError:
-                        photo['exif_data'] = {}
-                else:
-                    photo['exif_data'] = {}
-                photos.append(photo)
-            
-            return photos
+            return self._query_photos(self._recent_photos_sql(include_exif), (limit,), include_exif)
             
         except sqlite3.Error as e:
             print(f"获取最近照片失败: {e}")
             return []
     
-    def get_all_photos(self) -> List[Dict]:
+    def iter_recent_photos(self, limit: int = 20, include_exif: bool = True) -> Iterator[PhotoView]:
+        """
+        逐条产出最近导入的照片
+        
+        Args:
+            limit: 返回数量限制
+            include_exif: 是否读取并解析EXIF（exif_json、exif_data），只显示列表时可关闭
+            
+        Yields:
+            照片只读视图（PhotoView），需要普通字典时调用 copy()
+        """
+        try:
+            yield from self._iter_query(self._recent_photos_sql(include_exif), (limit,))
+            
+        except sqlite3.Error as e:
+            print(f"获取最近照片失败: {e}")
+    
+    def get_all_photos(self, include_exif: bool = True) -> List[Dict]:
         """
         获取所有照片
         
+        Args:
+            include_exif: 是否读取并解析EXIF（exif_json、exif_data），只检查文件时可关闭
+        
         Returns:
             所有照片列表
         """
         try:
-            self.db.cursor.execute('''
-                SELECT id, filename, path as relative_path, md5, size, created_at, 
-                       imported_at, type, exif_json, thumbnail_path, is_deleted
-                FROM photos 
-                WHERE is_deleted = 0 
-                ORDER BY imported_at DESC
-            ''')
-            
-            photos = []
-            for row in self.db.cursor.fetchall():
-                photo = dict(row)
-                if photo['exif_json']:
-                    try:
-                        photo['exif_data'] = json.loads(photo['exif_json'])
-                    except json.JSONDecodeError:
-                        photo['exif_data'] = {}
-                else:
-                    photo['exif_data'] = {}
-                photos.append(photo)
-            
-            return photos
+            return self._query_photos(self._all_photos_sql(include_exif), (), include_exif)
             
         except sqlite3.Error as e:
             print(f"获取所有照片失败: {e}")
             return []
     
-    def get_photos_by_date_range(self, start_date: str, end_date: str) -> List[Dict]:
+    def iter_all_photos(self, include_exif: bool = True) -> Iterator[PhotoView]:
+        """
+        逐条产出所有照片，大型照片库无需一次性载入全部记录
+        
+        Args:
+            include_exif: 是否读取并解析EXIF（exif_json、exif_data），只检查文件时可关闭
+        
+        Yields:
+            照片只读视图（PhotoView），需要普通字典时调用 copy()
+        """
+        try:
+            yield from self._iter_query(self._all_photos_sql(include_exif), ())
+            
+        except sqlite3.Error as e:
+            print(f"获取所有照片失败: {e}")
+    
+    def get_photos_by_date_range(self, start_date: str, end_date: str,
+                                 include_exif: bool = True) -> List[Dict]:
         """
         获取指定日期范围内的照片
         
         Args:
             start_date: 开始日期（YYYY-MM-DD）
             end_date: 结束日期（YYYY-MM-DD）
+            include_exif: 是否读取并解析EXIF（exif_json、exif_data），只显示列表时可关闭
             
         Returns:
             照片列表
         """
         try:
-            self.db.cursor.execute('''
-                SELECT * FROM photos 
-                WHERE DATE(created_at) BETWEEN ? AND ? 
-                AND is_deleted = 0
-                ORDER BY created_at DESC
-            ''', (start_date, end_date))
-            
-            photos = []
-            for row in self.db.cursor.fetchall():
-                photo = dict(row)
-                if photo['exif_json']:
-                    try:
-                        photo['exif_data'] = json.loads(photo['exif_json'])
-                    except json.JSONDecodeError:
-                        photo['exif_data'] = {}
-                else:
-                    photo['exif_data'] = {}
-                photos.append(photo)
-            
-            return photos
+            return self._query_photos(
+                self._date_range_sql(include_exif), (start_date, day_after(end_date)), include_exif
+            )
             
         except sqlite3.Error as e:
             print(f"按日期范围获取照片失败: {e}")
             return []
     
-    def search_photos_by_filename(self, filename_pattern: str) -> List[Dict]:
+    def iter_photos_by_date_range(self, start_date: str, end_date: str,
+                                  include_exif: bool = True) -> Iterator[PhotoView]:
+        """
+        逐条产出指定日期范围内的照片
+        
+        Args:
+            start_date: 开始日期（YYYY-MM-DD）
+            end_date: 结束日期（YYYY-MM-DD）
+            include_exif: 是否读取并解析EXIF（exif_json、exif_data），只显示列表时可关闭
+            
+        Yields:
+            照片只读视图（PhotoView），需要普通字典时调用 copy()
+        """
+        try:
+            yield from self._iter_query(
+                self._date_range_sql(include_exif), (start_date, day_after(end_date))
+            )
+            
+        except sqlite3.Error as e:
+            print(f"按日期范围获取照片失败: {e}")
+    
+    def search_photos_by_filename(self, filename_pattern: str,
+                                  include_exif: bool = True) -> List[Dict]:
         """
         根据文件名模式搜索照片
         
         Args:
             filename_pattern: 文件名模式（支持SQL LIKE语法）
+            include_exif: 是否读取并解析EXIF（exif_json、exif_data），只显示列表时可关闭
             
         Returns:
             照片列表
         """
         try:
-            self.db.cursor.execute('''
-                SELECT * FROM photos 
-                WHERE filename LIKE ? AND is_deleted = 0
+            # 有文件名全文索引时在trigram索引上匹配LIKE模式，前导%的子串搜索也不必扫描全表
+            if self.db.has_filename_fts:
+                filename_condition = "id IN (SELECT rowid FROM photos_fts WHERE filename LIKE ?)"
+            else:
+                filename_condition = "filename LIKE ?"
+            return self._query_photos(f'''
+                SELECT {self._select_columns(include_exif)} FROM photos 
+                WHERE {filename_condition} AND is_deleted = 0
                 ORDER BY imported_at DESC
-            ''', (filename_pattern,))
-            
-            photos = []
-            for row in self.db.cursor.fetchall():
-                photo = dict(row)
-                if photo['exif_json']:
-                    try:
-                        photo['exif_data'] = json.loads(photo['exif_json'])
-                    except json.JSONDecodeError:
-                        photo['exif_data'] = {}
-                else:
-                    photo['exif_data'] = {}
-                photos.append(photo)
-            
-            return photos
+            ''', (filename_pattern,), include_exif)
             
         except sqlite3.Error as e:
             print(f"按文件名搜索照片失败: {e}")
             return []
     
-    def get_photos_by_type(self, photo_type: str) -> List[Dict]:
+    def get_photos_by_type(self, photo_type: str, include_exif: bool = True) -> List[Dict]:
         """
         根据照片类型获取照片
         
         Args:
             photo_type: 照片类型（如 jpg, png, raw等）
+            include_exif: 是否读取并解析EXIF（exif_json、exif_data），只显示列表时可关闭
             
         Returns:
             照片列表
         """
         try:
-            self.db.cursor.execute('''
-                SELECT * FROM photos 
+            return self._query_photos(f'''
+                SELECT {self._select_columns(include_exif)} FROM photos 
                 WHERE type = ? AND is_deleted = 0
                 ORDER BY imported_at DESC
-            ''', (photo_type,))
-            
-            photos = []
-            for row in self.db.cursor.fetchall():
-                photo = dict(row)
-                if photo['exif_json']:
-                    try:
-                        photo['exif_data'] = json.loads(photo['exif_json'])
-                    except json.JSONDecodeError:
-                        photo['exif_data'] = {}
-                else:
-                    photo['exif_data'] = {}
-                photos.append(photo)
-            
-            return photos
+            ''', (photo_type,), include_exif)
             
         except sqlite3.Error as e:
             print(f"按类型获取照片失败: {e}")
@@ -322,30 +513,33 @@ class PhotoDAO:
         if not updates:
             return True
         
+        fields = tuple(key for key in self.UPDATABLE_FIELDS if key in updates)
+        if not fields:
+            return True
+        
         try:
-            # 构建更新SQL
-            set_clauses = []
             values = []
-            
-            for key, value in updates.items():
+            for key in fields:
+                value = updates[key]
                 if key == 'exif_data':
                     # 特殊处理EXIF数据
-                    set_clauses.append('exif_json = ?')
-                    values.append(json.dumps(value, ensure_ascii=False) if value else None)
-                elif key in ['filename', 'path', 'thumbnail_path', 'type']:
-                    set_clauses.append(f'{key} = ?')
-                    values.append(value)
-            
-            if not set_clauses:
-                return True
-            
+                    value = fast_json.dumps(value) if value else None
+                values.append(value)
             values.append(photo_id)
-            sql = f"UPDATE photos SET {', '.join(set_clauses)} WHERE id = ?"
             
-            self.db.cursor.execute(sql, values)
-            self.db.connection.commit()
+            sql = self._update_sql_cache.get(fields)
+            if sql is None:
+                set_clauses = ', '.join(
+                    'exif_json = ?' if key == 'exif_data' else f'{key} = ?'
+                    for key in fields
+                )
+                sql = f"UPDATE photos SET {set_clauses} WHERE id = ?"
+                self._update_sql_cache[fields] = sql
             
-            return self.db.cursor.rowcount > 0
+            # 连接作为上下文管理器：成功时提交，出错时回滚
+            with self.db.write_lock, self.db.connection:
+                self.db.cursor.execute(sql, values)
+                return self.db.cursor.rowcount > 0
             
         except sqlite3.Error as e:
             print(f"更新照片失败: {e}")
@@ -362,24 +556,33 @@ class PhotoDAO:
         Returns:
             是否删除成功
         """
-        try:
-            if soft_delete:
-                # 软删除：标记为已删除
-                self.db.cursor.execute('''
-                    UPDATE photos SET is_deleted = 1 WHERE id = ?
-                ''', (photo_id,))
-            else:
-                # 硬删除：真正删除记录
-                self.db.cursor.execute('''
-                    DELETE FROM photos WHERE id = ?
-                ''', (photo_id,))
+        return self.delete_photos([photo_id], soft_delete) > 0
+    
+    def delete_photos(self, photo_ids: List[int], soft_delete: bool = True) -> int:
+        """
+        在一个事务中批量删除照片（支持软删除和硬删除）
+        
+        Args:
+            photo_ids: 照片ID列表
+            soft_delete: 是否软删除（标记为删除而不是真正删除）
             
-            self.db.connection.commit()
-            return self.db.cursor.rowcount > 0
+        Returns:
+            删除的记录数，失败返回0
+        """
+        if not photo_ids:
+            return 0
+        
+        # 软删除：标记为已删除；硬删除：真正删除记录
+        sql = self.SOFT_DELETE_PHOTO_SQL if soft_delete else self.DELETE_PHOTO_SQL
+        try:
+            # 所有记录一次提交，连接作为上下文管理器：成功时提交，出错时整体回滚
+            with self.db.write_lock, self.db.connection:
+                self.db.cursor.executemany(sql, [(photo_id,) for photo_id in photo_ids])
+                return self.db.cursor.rowcount
             
         except sqlite3.Error as e:
             print(f"删除照片失败: {e}")
-            return False
+            return 0
     
     def get_photo_count(self) -> int:
         """
@@ -389,10 +592,7 @@ class PhotoDAO:
             照片总数
         """
         try:
-            self.db.cursor.execute('''
-                SELECT COUNT(*) as count FROM photos WHERE is_deleted = 0
-            ''')
-            result = self.db.cursor.fetchone()
+            result = self.db.connection.execute(Database.PHOTO_COUNT_SQL).fetchone()
             return result['count'] if result else 0
             
         except sqlite3.Error as e:
@@ -415,42 +615,18 @@ class PhotoDAO:
         }
         
         try:
-            # 总数和总大小
-            self.db.cursor.execute('''
-                SELECT COUNT(*) as count, SUM(size) as total_size 
-                FROM photos WHERE is_deleted = 0
-            ''')
-            result = self.db.cursor.fetchone()
-            if result:
-                stats["total_count"] = result['count'] or 0
-                stats["total_size"] = result['total_size'] or 0
-            
-            # 按类型分布
-            self.db.cursor.execute('''
-                SELECT type, COUNT(*) as count 
-                FROM photos WHERE is_deleted = 0 
-                GROUP BY type
-            ''')
-            for row in self.db.cursor.fetchall():
+            # 一次分组扫描取出全部统计，总数、总大小和时间范围由各类型汇总得到
+            latest = oldest = None
+            for row in self.db.connection.execute(self.PHOTOS_STATS_SQL).fetchall():
+                stats["total_count"] += row['count']
+                stats["total_size"] += row['total_size'] or 0
                 stats["type_distribution"][row['type']] = row['count']
-            
-            # 最新导入时间
-            self.db.cursor.execute('''
-                SELECT MAX(imported_at) as latest 
-                FROM photos WHERE is_deleted = 0
-            ''')
-            result = self.db.cursor.fetchone()
-            if result:
-                stats["latest_import"] = result['latest']
-            
-            # 最早照片时间
-            self.db.cursor.execute('''
-                SELECT MIN(created_at) as oldest 
-                FROM photos WHERE is_deleted = 0 AND created_at IS NOT NULL
-            ''')
-            result = self.db.cursor.fetchone()
-            if result:
-                stats["oldest_photo"] = result['oldest']
+                if row['latest'] is not None and (latest is None or row['latest'] > latest):
+                    latest = row['latest']
+                if row['oldest'] is not None and (oldest is None or row['oldest'] < oldest):
+                    oldest = row['oldest']
+            stats["latest_import"] = latest
+            stats["oldest_photo"] = oldest
             
         except sqlite3.Error as e:
             print(f"获取照片统计失败: {e}")
@@ -483,37 +659,26 @@ class PhotoDAO:
         """
         return self.photo_exists(md5, size)
     
-    def get_photos_by_directory(self, directory_path: str) -> List[Dict]:
+    def get_photos_by_directory(self, directory_path: str,
+                                include_exif: bool = True) -> List[Dict]:
         """
         根据目录路径获取照片
         
         Args:
             directory_path: 目录路径
+            include_exif: 是否读取并解析EXIF（exif_json、exif_data），只显示列表时可关闭
             
         Returns:
             照片列表
         """
         try:
-            # 使用 LIKE 查询匹配目录路径
-            self.db.cursor.execute('''
-                SELECT * FROM photos 
-                WHERE path LIKE ? AND is_deleted = 0
+            # 前缀匹配写成范围条件，可以使用path唯一索引；
+            # 目录名中的 % 和 _ 也不会被当作LIKE通配符
+            return self._query_photos(f'''
+                SELECT {self._select_columns(include_exif)} FROM photos 
+                WHERE path >= ? AND path < ? AND is_deleted = 0
                 ORDER BY filename ASC
-            ''', (f"{directory_path}%",))
-            
-            photos = []
-            for row in self.db.cursor.fetchall():
-                photo = dict(row)
-                if photo['exif_json']:
-                    try:
-                        photo['exif_data'] = json.loads(photo['exif_json'])
-                    except json.JSONDecodeError:
-                        photo['exif_data'] = {}
-                else:
-                    photo['exif_data'] = {}
-                photos.append(photo)
-            
-            return photos
+            ''', (directory_path, directory_path + PATH_PREFIX_END), include_exif)
             
         except sqlite3.Error as e:
             print(f"按目录获取照片失败: {e}")
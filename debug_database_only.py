@@ -227,7 +227,7 @@ def debug_database_exif_storage():
         # 清理临时文件
         try:
             if 'db_manager' in locals():
-                db_manager.database.close()
+                db_manager.shutdown()
             shutil.rmtree(temp_dir)
             print(f"✅ 清理临时目录: {temp_dir}")
         except Exception as e:
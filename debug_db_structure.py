@@ -25,39 +25,46 @@ def check_database_structure():
         conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
         
-        # 1. 获取所有表名
+        # 1. 一次查询取出所有表及其列（pragma_table_xinfo 同时返回隐藏列）
         print("1️⃣ 获取所有表名...")
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = cursor.fetchall()
+        cursor.execute("""
+            SELECT m.name, p.name, p.type, p."notnull", p.pk, p.hidden
+            FROM sqlite_master m JOIN pragma_table_xinfo(m.name) p
+            WHERE m.type = 'table'
+            ORDER BY m.rowid, p.cid
+        """)
+        table_columns = {}
+        for table_name, *column in cursor.fetchall():
+            table_columns.setdefault(table_name, []).append(column)
+        tables = list(table_columns)
         
         if tables:
             print(f"✅ 找到 {len(tables)} 个表:")
-            for table in tables:
-                print(f"   📋 {table[0]}")
+            for table_name in tables:
+                print(f"   📋 {table_name}")
         else:
             print("❌ 未找到任何表")
             return False
         
+        # 所有表的记录数合并为一条 UNION ALL 查询
+        cursor.execute(" UNION ALL ".join(
+            f'SELECT ?, COUNT(*) FROM "{table_name}"' for table_name in tables
+        ), tables)
+        table_counts = dict(cursor.fetchall())
+        
         # 2. 检查每个表的结构
         print(f"\n2️⃣ 检查表结构...")
-        for table in tables:
-            table_name = table[0]
+        for table_name in tables:
             print(f"\n📋 表: {table_name}")
             
-            # 获取表结构
-            cursor.execute(f"PRAGMA table_info({table_name});")
-            columns = cursor.fetchall()
-            
-            if columns:
-                print(f"   列数: {len(columns)}")
-                for col in columns:
-                    cid, name, type_, notnull, default, pk = col
-                    print(f"   - {name} ({type_}){' [主键]' if pk else ''}{' [非空]' if notnull else ''}")
+            # 表结构
+            columns = table_columns[table_name]
+            print(f"   列数: {len(columns)}")
+            for name, type_, notnull, pk, hidden in columns:
+                print(f"   - {name} ({type_}){' [主键]' if pk else ''}{' [非空]' if notnull else ''}{' [隐藏]' if hidden else ''}")
             
-            # 获取表中的记录数
-            cursor.execute(f"SELECT COUNT(*) FROM {table_name};")
-            count = cursor.fetchone()[0]
-            print(f"   记录数: {count}")
+            # 表中的记录数
+            print(f"   记录数: {table_counts[table_name]}")
             
             # 如果是照片相关的表，显示一些示例数据
             if any(keyword in table_name.lower() for keyword in ['photo', 'image', 'pic']):
@@ -69,20 +76,18 @@ def check_database_structure():
         
         # 3. 查找包含GPS或EXIF信息的表
         print(f"\n3️⃣ 查找包含GPS/EXIF信息的表...")
-        for table in tables:
-            table_name = table[0]
-            cursor.execute(f"PRAGMA table_info({table_name});")
-            columns = cursor.fetchall()
+        for table_name in tables:
+            columns = table_columns[table_name]
             
             gps_columns = []
             exif_columns = []
             
             for col in columns:
-                col_name = col[1].lower()
+                col_name = col[0].lower()
                 if 'gps' in col_name:
-                    gps_columns.append(col[1])
+                    gps_columns.append(col[0])
                 if 'exif' in col_name:
-                    exif_columns.append(col[1])
+                    exif_columns.append(col[0])
             
             if gps_columns or exif_columns:
                 print(f"   📋 {table_name}:")
@@ -95,17 +100,15 @@ def check_database_structure():
         print(f"\n4️⃣ 查找包含 'IMG_20250819_094620.jpg' 的记录...")
         target_filename = "IMG_20250819_094620.jpg"
         
-        for table in tables:
-            table_name = table[0]
-            cursor.execute(f"PRAGMA table_info({table_name});")
-            columns = cursor.fetchall()
+        for table_name in tables:
+            columns = table_columns[table_name]
             
             # 查找可能包含文件名的列
             filename_columns = []
             for col in columns:
-                col_name = col[1].lower()
+                col_name = col[0].lower()
                 if any(keyword in col_name for keyword in ['name', 'file', 'path']):
-                    filename_columns.append(col[1])
+                    filename_columns.append(col[0])
             
             if filename_columns:
                 for col_name in filename_columns:
@@ -126,6 +126,8 @@ def test_full_import_process():
     finally:
         # 清理临时文件
         try:
+            if 'db_manager' in locals():
+                db_manager.shutdown()
             shutil.rmtree(temp_dir)
             print(f"\n🧹 已清理临时目录: {temp_dir}")
         except Exception as e:
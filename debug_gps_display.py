@@ -275,7 +275,7 @@ def test_gps_data_display():
         print("\n8️⃣ 清理临时文件...")
         try:
             if 'db_manager' in locals():
-                db_manager.close()
+                db_manager.shutdown()
             shutil.rmtree(temp_dir)
             print("✅ 临时文件清理完成")
         except Exception as e:
@@ -6,9 +6,27 @@
 
 import sys
 import os
+import functools
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from photo_importer import extract_exif_data
+from libs import fast_json
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_exif_data(file_path: str, mtime_ns: int, size: int):
+    """按 (路径, 修改时间, 大小) 缓存EXIF解析结果，mtime_ns 和 size 只作为缓存键"""
+    return extract_exif_data(file_path)
+
+
+def cached_extract_exif_data(file_path: str):
+    """
+    同一进程内反复调试同一张照片时复用EXIF解析结果，文件改动后重新解析
+    返回的字典被缓存共享，只用于查看，不应修改
+    """
+    stat = os.stat(file_path)
+    return _cached_exif_data(file_path, stat.st_mtime_ns, stat.st_size)
+
 
 def test_exif_extraction():
     """测试EXIF数据提取"""
@@ -27,7 +45,7 @@ def test_exif_extraction():
     # 调用extract_exif_data函数
     print("\n📋 调用 extract_exif_data 函数...")
     try:
-        exif_data = extract_exif_data(test_photo)
+        exif_data = cached_extract_exif_data(test_photo)
         
         if exif_data is None:
             print("❌ extract_exif_data 返回 None")
@@ -64,15 +82,14 @@ def test_exif_extraction():
             else:
                 print(f"   ❌ 缺少 {field}")
         
-        # 测试JSON序列化
+        # 测试JSON序列化（与数据库写入 exif_json 时使用相同的编解码）
         print(f"\n🔄 测试JSON序列化...")
-        import json
         try:
-            json_str = json.dumps(exif_data, ensure_ascii=False)
+            json_str = fast_json.dumps(exif_data)
             print(f"✅ JSON序列化成功，长度: {len(json_str)} 字符")
             
             # 测试反序列化
-            parsed_data = json.loads(json_str)
+            parsed_data = fast_json.loads(json_str)
             print(f"✅ JSON反序列化成功，包含 {len(parsed_data)} 个字段")
             
             if 'GPSInfo' in parsed_data:
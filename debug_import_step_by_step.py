@@ -15,7 +15,7 @@ from datetime import datetime
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from db.database_manager import DatabaseManager
-from photo_importer import extract_exif_data, calculate_file_md5, extract_photo_datetime
+from photo_importer import extract_photo_metadata, calculate_file_md5
 
 def debug_import_step_by_step(test_photo_path=None):
     """逐步调试导入过程"""
@@ -86,12 +86,9 @@ def debug_import_step_by_step(test_photo_path=None):
         print(f"✅ MD5: {md5_hash}")
         print(f"✅ 文件大小: {file_size} 字节")
         
-        # 3.2 提取照片时间
-        photo_time = extract_photo_datetime(test_photo)
+        # 3.2 提取照片时间和EXIF数据（与导入流程相同，一次解析）
+        photo_time, exif_data = extract_photo_metadata(test_photo)
         print(f"✅ 照片时间: {photo_time}")
-        
-        # 3.3 提取EXIF数据
-        exif_data = extract_exif_data(test_photo)
         print(f"✅ EXIF数据提取: {'成功' if exif_data else '失败'}")
         if exif_data:
             print(f"   EXIF字段数: {len(exif_data)}")
@@ -213,7 +210,7 @@ def debug_import_step_by_step(test_photo_path=None):
         # 清理临时文件
         try:
             if 'db_manager' in locals():
-                db_manager.database.close()
+                db_manager.shutdown()
             shutil.rmtree(temp_dir)
             print(f"✅ 清理临时目录: {temp_dir}")
         except Exception as e:
@@ -79,7 +79,7 @@ def init_database():
     for photo in recent_photos:
         print(f"  ID: {photo['id']}, 文件名: {photo['filename']}, 路径: {photo['path']}")
     
-    dao_manager.close()
+    dao_manager.shutdown()
     return True
 
 if __name__ == "__main__":
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON编解码工具
+安装了orjson时使用其C实现加速，否则回退到标准库json，接口与输出格式保持一致
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# json.JSONDecodeError 和 orjson.JSONDecodeError 都是 ValueError 的子类
+JSONDecodeError = ValueError
+
+
+def loads(data: Any) -> Any:
+    """
+    解析JSON字符串或字节串
+
+    Args:
+        data: JSON文本（str或bytes）
+
+    Returns:
+        解析后的Python对象
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """
+    序列化为JSON字符串（不转义非ASCII字符）
+
+    Args:
+        obj: 要序列化的对象
+        indent: 是否使用2空格缩进
+
+    Returns:
+        JSON字符串
+    """
+    if orjson is not None:
+        # EXIF等数据中可能出现整数键，与标准库一样转换为字符串
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, option=option).decode('utf-8')
+        except TypeError:
+            # 超出64位的整数等orjson不支持的值，交给标准库处理
+            pass
+
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False)
@@ -5,9 +5,14 @@
 
 import os
 import shutil
+import sqlite3
 import hashlib
+import mmap
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
 from datetime import datetime
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, Iterator
 from pathlib import Path
 import json
 
@@ -20,6 +25,17 @@ import exifread
 from db.database_manager import DatabaseManager
 
 
+# 导入记录攒够此数量后在一个事务中写入数据库
+IMPORT_BATCH_SIZE = 200
+
+# 导入时预先计算文件MD5的线程数；hashlib计算和文件读取都会释放GIL，
+# 后台线程可以在主流程复制和解析前一张照片时并行哈希后续文件
+HASH_WORKERS = min(4, os.cpu_count() or 1)
+
+# 最多提前计算MD5的文件数
+HASH_PREFETCH = HASH_WORKERS * 2
+
+
 class PhotoImportWorker(QThread):
     """照片导入工作线程"""
     
@@ -51,17 +67,30 @@ class PhotoImportWorker(QThread):
         skip_count = 0
         error_count = 0
         
-        with DatabaseManager(self.db_path) as db_manager:
-            for i, file_path in enumerate(self.files):
+        # 已复制、等待批量写入数据库的记录：(源文件路径, 目标路径, 记录)
+        self._pending_records = []
+        # 待写入记录的 (MD5, 大小)，用于识别同一批次中内容相同的文件
+        self._pending_keys = set()
+        
+        with DatabaseManager(self.db_path) as db_manager, \
+                ThreadPoolExecutor(max_workers=HASH_WORKERS) as hash_pool:
+            # 导入仍按文件顺序逐个处理，去重判断与单线程时一致
+            hash_futures = self._iter_hash_futures(hash_pool)
+            
+            for i, (file_path, hash_future) in enumerate(zip(self.files, hash_futures)):
                 if self.is_cancelled:
                     break
                     
                 self.progress_updated.emit(i + 1, len(self.files), file_path)
                 
                 try:
-                    result = self._import_single_photo(file_path, db_manager)
-                    if result == "success":
-                        success_count += 1
+                    file_hash = hash_future.result()
+                    result = self._import_single_photo(file_path, db_manager, file_hash)
+                    if result == "queued":
+                        if len(self._pending_records) >= IMPORT_BATCH_SIZE:
+                            imported, failed = self._flush_records(db_manager)
+                            success_count += imported
+                            error_count += failed
                     elif result == "skipped":
                         skip_count += 1
                     else:
@@ -70,35 +99,73 @@ class PhotoImportWorker(QThread):
                 except Exception as e:
                     self.error_occurred.emit(file_path, str(e))
                     error_count += 1
+            
+            # 取消尚未开始的哈希任务
+            hash_futures.close()
+            
+            # 取消时已复制的文件同样写入数据库
+            imported, failed = self._flush_records(db_manager)
+            success_count += imported
+            error_count += failed
         
         self.import_completed.emit(success_count, skip_count, error_count)
     
+    def _iter_hash_futures(self, hash_pool: ThreadPoolExecutor) -> Iterator[Future]:
+        """
+        按文件顺序产出MD5计算任务，最多提前 HASH_PREFETCH 个文件提交，
+        预读的文件在复制时仍在页缓存中
+        
+        Args:
+            hash_pool: 计算MD5的线程池
+            
+        Yields:
+            Future: 结果为 (MD5值, 文件大小) 的任务
+        """
+        files = iter(self.files)
+        pending = deque(
+            hash_pool.submit(calculate_file_md5, file_path)
+            for file_path in islice(files, HASH_PREFETCH)
+        )
+        try:
+            for file_path in files:
+                yield pending.popleft()
+                pending.append(hash_pool.submit(calculate_file_md5, file_path))
+            while pending:
+                yield pending.popleft()
+        finally:
+            # 提前结束（取消导入）时丢弃尚未开始的任务
+            for future in pending:
+                future.cancel()
+    
     def cancel(self):
         """取消导入任务"""
         self.is_cancelled = True
     
-    def _import_single_photo(self, file_path: str, db_manager: DatabaseManager) -> str:
+    def _import_single_photo(self, file_path: str, db_manager: DatabaseManager,
+                             file_hash: Optional[Tuple[str, int]] = None) -> str:
         """
         导入单张照片
         
         Args:
             file_path: 源文件路径
             db_manager: 数据库管理器
+            file_hash: 预先计算好的 (MD5值, 文件大小)，为None时在此计算
             
         Returns:
-            str: "success", "skipped", "error"
+            str: "queued"（已复制，等待批量写入数据库）, "skipped", "error"
         """
         try:
             # 1. 计算文件MD5和大小
-            md5_hash, file_size = calculate_file_md5(file_path)
+            md5_hash, file_size = file_hash or calculate_file_md5(file_path)
             
-            # 2. 检查是否已存在
-            if db_manager.photo_exists_by_hash(md5_hash, file_size):
+            # 2. 检查是否已存在（包括本批次中尚未写入数据库的文件）
+            key = (md5_hash, file_size)
+            if key in self._pending_keys or db_manager.photo_exists_by_hash(md5_hash, file_size):
                 self.photo_skipped.emit(file_path, "文件已存在（MD5+大小匹配）")
                 return "skipped"
             
-            # 3. 提取时间信息
-            photo_time = extract_photo_datetime(file_path)
+            # 3. 提取时间信息和EXIF数据（一次解析同时得到两者）
+            photo_time, exif_data = extract_photo_metadata(file_path)
             
             # 4. 生成目标路径
             target_path = generate_target_path(
@@ -113,33 +180,72 @@ class PhotoImportWorker(QThread):
             # 6. 获取相对路径
             relative_path = os.path.relpath(final_path, self.target_dir)
             
-            # 7. 提取EXIF数据
-            exif_data = extract_exif_data(file_path)
-            
-            # 8. 添加到数据库
+            # 7. 加入待写入队列，由 _flush_records 批量写入数据库
             filename = os.path.basename(final_path)
             file_ext = os.path.splitext(filename)[1].lower().lstrip('.')
             
-            photo_id = db_manager.add_photo_record(
-                filename=filename,
-                relative_path=relative_path,
-                md5=md5_hash,
-                size=file_size,
-                created_at=photo_time.isoformat(),
-                photo_type=file_ext,
-                exif_data=exif_data
-            )
-            
-            if photo_id:
-                self.photo_imported.emit(file_path, final_path)
-                return "success"
-            else:
-                self.error_occurred.emit(file_path, "数据库写入失败")
-                return "error"
+            self._pending_records.append((file_path, final_path, {
+                'filename': filename,
+                'relative_path': relative_path,
+                'md5': md5_hash,
+                'size': file_size,
+                'created_at': photo_time.isoformat(),
+                'photo_type': file_ext,
+                'exif_data': exif_data
+            }))
+            self._pending_keys.add(key)
+            return "queued"
                 
         except Exception as e:
             self.error_occurred.emit(file_path, str(e))
             return "error"
+    
+    def _flush_records(self, db_manager: DatabaseManager) -> Tuple[int, int]:
+        """
+        在一个事务中写入队列中的照片记录，并逐条发出导入结果信号
+        
+        Args:
+            db_manager: 数据库管理器
+            
+        Returns:
+            Tuple[int, int]: (写入成功数, 写入失败数)
+        """
+        if not self._pending_records:
+            return 0, 0
+        
+        pending, self._pending_records = self._pending_records, []
+        # 写入后由数据库查重，不再需要内存中的待写入集合
+        self._pending_keys.clear()
+        
+        try:
+            photo_ids = db_manager.add_photo_records_with_ids([record for _, _, record in pending])
+        except sqlite3.Error as e:
+            for file_path, final_path, _ in pending:
+                # 记录未写入数据库，删除已复制的文件，避免库目录中留下无记录的照片
+                _remove_quietly(final_path)
+                self.error_occurred.emit(file_path, f"数据库写入失败: {e}")
+            return 0, len(pending)
+        
+        imported = 0
+        for (file_path, final_path, _), photo_id in zip(pending, photo_ids):
+            if photo_id:
+                self.photo_imported.emit(file_path, final_path)
+                imported += 1
+            else:
+                # 写入前已查重，到这里仍冲突说明记录在此期间已被其他写入方添加，
+                # 库中已有同一内容的照片，复制出的文件不再需要
+                _remove_quietly(final_path)
+                self.error_occurred.emit(file_path, "照片记录已存在")
+        
+        return imported, len(pending) - imported
+
+
+def _remove_quietly(file_path: str) -> None:
+    """删除文件，文件不存在或无法删除时忽略"""
+    try:
+        os.remove(file_path)
+    except OSError:
+        pass
 
 
 class PhotoImporter:
@@ -257,8 +363,8 @@ class PhotoImporter:
                 db_manager.close()
                 return {'success': False, 'error': f'照片已存在 (MD5: {md5_hash})'}
             
-            # 获取照片时间
-            photo_time = extract_photo_datetime(file_path)
+            # 获取照片时间和EXIF数据
+            photo_time, exif_data = extract_photo_metadata(file_path)
             
             # 生成目标路径
             target_path = generate_target_path(
@@ -270,9 +376,6 @@ class PhotoImporter:
             # 复制文件（处理重命名冲突）
             final_path = copy_file_with_conflict_resolution(file_path, target_path)
             
-            # 提取EXIF数据
-            exif_data = extract_exif_data(file_path)
-            
             # 添加到数据库
             filename = os.path.basename(final_path)
             relative_path = os.path.relpath(final_path, self.target_dir)
@@ -373,10 +476,10 @@ def extract_photo_datetime(file_path: str) -> datetime:
         with open(file_path, 'rb') as f:
             tags = exifread.process_file(f, stop_tag='EXIF DateTimeOriginal')
             
-            # 优先级顺序：DateTimeOriginal > CreateDate > DateTime
+            # 优先级顺序：DateTimeOriginal > DateTimeDigitized > DateTime
             time_tags = [
                 'EXIF DateTimeOriginal',
-                'EXIF CreateDate', 
+                'EXIF DateTimeDigitized',
                 'EXIF DateTime',
                 'Image DateTime'
             ]
@@ -400,22 +503,69 @@ def extract_photo_datetime(file_path: str) -> datetime:
         return datetime.fromtimestamp(mtime)
 
 
+def extract_photo_metadata(file_path: str) -> Tuple[datetime, Optional[Dict[str, Any]]]:
+    """
+    一次解析同时得到照片的拍摄时间和EXIF数据
+    拍摄时间直接取自已解析的EXIF，只有EXIF中没有时间信息时才由 extract_photo_datetime 另外读取文件
+    
+    Args:
+        file_path: 图片文件路径
+        
+    Returns:
+        Tuple[datetime, Optional[Dict]]: (照片时间, EXIF数据字典)
+    """
+    exif_data = extract_exif_data(file_path)
+    photo_time = photo_datetime_from_exif(exif_data) if exif_data else None
+    if photo_time is None:
+        photo_time = extract_photo_datetime(file_path)
+    return photo_time, exif_data
+
+
+def photo_datetime_from_exif(exif_data: Dict[str, Any]) -> Optional[datetime]:
+    """
+    从 extract_exif_data 返回的EXIF字典中取拍摄时间
+    
+    Args:
+        exif_data: EXIF数据字典
+        
+    Returns:
+        Optional[datetime]: 照片时间，没有可用的时间信息返回None
+    """
+    # 优先级顺序与 extract_photo_datetime 相同：
+    # DateTimeOriginal > DateTimeDigitized > DateTime
+    for tag in ('DateTimeOriginal', 'DateTimeDigitized', 'DateTime'):
+        time_str = exif_data.get(tag)
+        if isinstance(time_str, str):
+            try:
+                # EXIF时间格式：YYYY:MM:DD HH:MM:SS
+                return datetime.strptime(time_str.strip('\x00 '), '%Y:%m:%d %H:%M:%S')
+            except ValueError:
+                continue
+    return None
+
+
 def calculate_file_md5(file_path: str, chunk_size: int = 8192) -> Tuple[str, int]:
     """
     计算文件的MD5值和大小
-    使用分块读取处理大文件
+    文件映射到内存后一次交给hashlib计算，不在Python中逐块循环；
+    无法映射时（如空文件）退回分块读取
     
     Args:
         file_path: 文件路径
-        chunk_size: 分块大小（字节）
+        chunk_size: 退回分块读取时的分块大小（字节）
         
     Returns:
         Tuple[str, int]: (MD5值, 文件大小)
     """
-    md5_hash = hashlib.md5()
-    file_size = 0
-    
     with open(file_path, 'rb') as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return hashlib.md5(mapped).hexdigest(), len(mapped)
+        except (ValueError, OSError):
+            pass
+        
+        md5_hash = hashlib.md5()
+        file_size = 0
         while chunk := f.read(chunk_size):
             md5_hash.update(chunk)
             file_size += len(chunk)
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+ConfigDAO 测试：配置缓存在共享同一数据库的实例之间保持一致
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from db.database import Database
+from db.config_dao import ConfigDAO
+
+
+class ConfigDAOSharedCacheTest(unittest.TestCase):
+    """一个实例写入后，共享同一Database的其他实例读到新值"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = Database(os.path.join(self.temp_dir, 'test.db'))
+        self.db.connect()
+        self.db.initialize()
+        self.writer = ConfigDAO(self.db)
+        self.reader = ConfigDAO(self.db)
+        
+        self.writer.set_config('theme', 'light')
+        self.writer.set_config('recent', ['a'])
+        # 读取一次，使读取方的缓存完成加载
+        self.assertEqual(self.reader.get_config('theme'), 'light')
+    
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_set_config(self):
+        self.writer.set_config('theme', 'dark')
+        self.assertEqual(self.reader.get_config('theme'), 'dark')
+        self.assertEqual(self.writer.get_config('theme'), 'dark')
+    
+    def test_delete_and_pop(self):
+        self.assertTrue(self.writer.delete_config('theme'))
+        self.assertIsNone(self.reader.get_config('theme'))
+        
+        self.assertEqual(self.writer.pop_config('recent'), ['a'])
+        self.assertFalse(self.reader.config_exists('recent'))
+    
+    def test_delete_configs(self):
+        self.assertEqual(self.writer.delete_configs(['theme', 'recent']), 2)
+        self.assertEqual(self.reader.get_all_configs().get('theme'), None)
+        self.assertFalse(self.reader.config_exists('theme'))
+    
+    def test_delete_configs_in_caller_transaction(self):
+        self.db.connection.execute('BEGIN')
+        self.assertEqual(self.writer.delete_configs(['theme']), 1)
+        self.assertTrue(self.db.connection.in_transaction)
+        self.db.connection.rollback()
+        self.assertEqual(self.writer.get_config('theme'), 'light')
+        self.assertEqual(self.reader.get_config('theme'), 'light')
+    
+    def test_restore_configs(self):
+        self.assertTrue(self.writer.restore_configs({'configs': {'theme': 'blue', 'zoom': 2}}))
+        self.assertEqual(self.reader.get_config('theme'), 'blue')
+        self.assertEqual(self.reader.get_config('zoom'), 2)
+    
+    def test_restore_configs_in_caller_transaction(self):
+        self.db.connection.execute('BEGIN')
+        self.assertTrue(self.writer.restore_configs({'configs': {'theme': 'blue'}}))
+        # 调用方的事务保持打开，回滚后恢复的配置一并撤销
+        self.assertTrue(self.db.connection.in_transaction)
+        self.db.connection.rollback()
+        self.assertEqual(self.writer.get_config('theme'), 'light')
+        self.assertEqual(self.reader.get_config('theme'), 'light')
+    
+    def test_search_configs_prefix(self):
+        for key in ('ui@a', 'ui@b', 'uiA', 'ui[', 'UI@c', 'x\U0010ffffa', 'x\U0010ffff'):
+            self.writer.set_config(key, 1)
+        self.assertEqual([c['key'] for c in self.reader.search_configs_prefix('ui@')],
+                         ['ui@a', 'ui@b'])
+        self.assertEqual([c['key'] for c in self.reader.search_configs_prefix('x\U0010ffff')],
+                         ['x\U0010ffff', 'x\U0010ffffa'])
+    
+    def test_database_layer_write(self):
+        self.db.set_config('theme', 'sepia')
+        self.assertEqual(self.reader.get_config('theme'), 'sepia')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+core.photo_importer 批量导入测试：通过临时数据库写入真实批次
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+try:
+    import PyQt6  # noqa: F401
+except ImportError:
+    PyQt6 = None
+
+from db.database_manager import DatabaseManager
+
+
+@unittest.skipIf(PyQt6 is None, "需要PyQt6")
+class CorePhotoImporterBatchTest(unittest.TestCase):
+    """PhotoImportWorker 准备的记录能被 DatabaseManager 批量写入"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.source_dir = os.path.join(self.temp_dir, 'source')
+        self.library_dir = os.path.join(self.temp_dir, 'library')
+        os.makedirs(self.source_dir)
+        os.makedirs(self.library_dir)
+        
+        self.files = []
+        for i in range(3):
+            file_path = os.path.join(self.source_dir, f'IMG_{i:03d}.jpg')
+            with open(file_path, 'wb') as f:
+                f.write(f'photo {i}'.encode() * (i + 1))
+            self.files.append(file_path)
+        
+        self.db_path = os.path.join(self.library_dir, '.library.db')
+        self.db_manager = DatabaseManager(self.db_path)
+        self.db_manager.initialize()
+    
+    def tearDown(self):
+        self.db_manager.shutdown()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _make_worker(self, files):
+        from core.photo_importer import PhotoImportWorker
+        return PhotoImportWorker(files, self.library_dir, self.db_manager)
+    
+    def _library_files(self):
+        return [
+            os.path.join(root, name)
+            for root, _, names in os.walk(self.library_dir)
+            for name in names
+            if not name.startswith('.library.db')
+        ]
+    
+    def test_batch_is_written_to_database(self):
+        worker = self._make_worker(self.files)
+        worker.run()
+        
+        self.assertEqual(worker.stats['imported'], len(self.files))
+        self.assertEqual(worker.stats['errors'], 0, worker.stats['error_files'])
+        
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute('SELECT filename, path, md5, size, type FROM photos').fetchall()
+        self.assertEqual(sorted(row[0] for row in rows),
+                         sorted(os.path.basename(f) for f in self.files))
+        for filename, path, md5, size, photo_type in rows:
+            self.assertTrue(os.path.isfile(os.path.join(self.library_dir, path)))
+            self.assertEqual(size, os.path.getsize(os.path.join(self.source_dir, filename)))
+            self.assertEqual(len(md5), 32)
+            self.assertEqual(photo_type, 'jpg')
+        
+        # 再次导入相同文件时全部按重复跳过
+        worker = self._make_worker(self.files)
+        worker.run()
+        self.assertEqual(worker.stats['imported'], 0)
+        self.assertEqual(worker.stats['skipped'], len(self.files))
+    
+    def test_failed_batch_removes_copied_files(self):
+        worker = self._make_worker(self.files)
+        with mock.patch.object(self.db_manager, 'add_photo_records',
+                               side_effect=sqlite3.OperationalError('disk I/O error')):
+            worker.run()
+        
+        self.assertEqual(worker.stats['imported'], 0)
+        self.assertEqual(worker.stats['errors'], len(self.files))
+        self.assertEqual(self._library_files(), [])
+
+    
+    def test_failed_copy_removes_placeholder(self):
+        worker = self._make_worker(self.files)
+        with mock.patch('core.photo_importer._fast_copy',
+                        side_effect=OSError('No space left on device')):
+            worker.run()
+        
+        self.assertEqual(worker.stats['imported'], 0)
+        self.assertEqual(worker.stats['errors'], len(self.files))
+        self.assertEqual(self._library_files(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
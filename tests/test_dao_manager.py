@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+DAOManager 文件名搜索测试
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from db.dao_manager import DAOManager, _like_prefix_range
+
+
+class LikePrefixRangeTest(unittest.TestCase):
+    """前缀LIKE模式改写为范围条件"""
+    
+    def test_plain_prefix(self):
+        self.assertEqual(_like_prefix_range('IMG2025%'), ('img2025', 'img2026'))
+    
+    def test_not_a_prefix(self):
+        for pattern in ('IMG', '%IMG%', 'IMG_%', '%'):
+            with self.subTest(pattern):
+                self.assertIsNone(_like_prefix_range(pattern))
+    
+    def test_successor_folded_by_nocase(self):
+        # '@' 的后继 'A' 在NOCASE下等同于 'a'，范围会包含 x[、x_ 等开头的文件名
+        self.assertIsNone(_like_prefix_range('x@%'))
+    
+    def test_successor_is_surrogate(self):
+        self.assertIsNone(_like_prefix_range('x\ud7ff%'))
+
+
+class SearchPhotosPrefixTest(unittest.TestCase):
+    """前缀搜索与LIKE的匹配结果一致"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.dao_manager = DAOManager(os.path.join(self.temp_dir, 'test.db'))
+        self.dao_manager.initialize()
+        names = ['x@1.jpg', 'X@2.jpg', 'x[3.jpg', 'x_4.jpg', 'xa5.jpg', 'y@6.jpg']
+        self.dao_manager.add_photos_bulk([
+            {'filename': name, 'path': f'p/{i}/{name}', 'md5': str(i), 'size': i}
+            for i, name in enumerate(names)
+        ])
+    
+    def tearDown(self):
+        self.dao_manager.shutdown()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_prefix_ending_in_at_sign(self):
+        photos = self.dao_manager.search_photos(filename_pattern='x@%')
+        self.assertEqual(sorted(p['filename'] for p in photos), ['X@2.jpg', 'x@1.jpg'])
+
+
+if __name__ == '__main__':
+    unittest.main()
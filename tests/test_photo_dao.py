@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+PhotoDAO 查询结果测试：列表方法返回普通字典，迭代方法的视图可转为字典
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from db.database import Database
+from db.photo_dao import PhotoDAO
+
+
+class PhotoDAOResultTypeTest(unittest.TestCase):
+    """各查询方法的结果可以像普通字典一样被调用方修改和序列化"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = Database(os.path.join(self.temp_dir, 'test.db'))
+        self.db.connect()
+        self.db.initialize()
+        self.dao = PhotoDAO(self.db)
+        self.dao.insert_photos([
+            {
+                'filename': f'IMG_{i:03d}.jpg',
+                'path': f'2025/08/14/IMG_{i:03d}.jpg',
+                'md5': f'md5_{i:03d}',
+                'size': 1000 + i,
+                'created_at': f'2025-08-14T10:{i:02d}:00',
+                'photo_type': 'jpg',
+                'exif_data': {'Make': 'Canon', 'GPSInfo': {'GPSLatitudeRef': 'N'}} if i % 2 else None
+            }
+            for i in range(4)
+        ])
+    
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _list_results(self):
+        return {
+            'get_recent_photos': self.dao.get_recent_photos(10),
+            'get_recent_photos(include_exif=False)': self.dao.get_recent_photos(10, include_exif=False),
+            'get_all_photos': self.dao.get_all_photos(),
+            'get_all_photos(include_exif=False)': self.dao.get_all_photos(include_exif=False),
+            'get_photos_by_date_range': self.dao.get_photos_by_date_range('2025-08-14', '2025-08-14'),
+            'search_photos_by_filename': self.dao.search_photos_by_filename('IMG%'),
+            'get_photos_by_type': self.dao.get_photos_by_type('jpg'),
+        }
+    
+    def test_list_methods_return_plain_dicts(self):
+        for name, photos in self._list_results().items():
+            with self.subTest(name):
+                self.assertEqual(len(photos), 4)
+                for photo in photos:
+                    self.assertIs(type(photo), dict)
+                    
+                    # 调用方常见的用法：复制、改写字段、序列化
+                    copied = photo.copy()
+                    copied['filename'] = 'renamed.jpg'
+                    self.assertNotEqual(photo['filename'], 'renamed.jpg')
+                    photo['thumbnail_path'] = '/tmp/thumb.jpg'
+                    json.loads(json.dumps(photo))
+    
+    def test_exif_data_is_decoded(self):
+        photos = {p['filename']: p for p in self.dao.get_all_photos()}
+        self.assertEqual(photos['IMG_001.jpg']['exif_data']['GPSInfo'], {'GPSLatitudeRef': 'N'})
+        self.assertEqual(photos['IMG_000.jpg']['exif_data'], {})
+        
+        photos = self.dao.get_all_photos(include_exif=False)
+        self.assertTrue(all('exif_data' not in p for p in photos))
+    
+    def test_iter_views_convert_to_dicts(self):
+        for photo in self.dao.iter_all_photos():
+            self.assertEqual(photo['filename'], photo.get('filename'))
+            self.assertIn('exif_data', photo)
+            with self.assertRaises(KeyError):
+                photo['no_such_column']
+            with self.assertRaises(TypeError):
+                photo['filename'] = 'renamed.jpg'
+            
+            copied = photo.copy()
+            self.assertIs(type(copied), dict)
+            self.assertEqual(copied, dict(photo))
+            copied['filename'] = 'renamed.jpg'
+            json.loads(json.dumps(copied))
+
+    
+    def test_list_and_iter_read_same_snapshot(self):
+        # 主连接上未提交的写入对列表方法和迭代方法同样不可见
+        with self.db.write_lock:
+            self.db.connection.execute('BEGIN IMMEDIATE')
+            try:
+                self.db.connection.execute(
+                    "UPDATE photos SET is_deleted = 1 WHERE filename = 'IMG_000.jpg'"
+                )
+                for include_exif in (True, False):
+                    listed = self.dao.get_photos_by_type('jpg', include_exif=include_exif)
+                    iterated = list(self.dao.iter_all_photos(include_exif=include_exif))
+                    self.assertEqual(len(listed), 4)
+                    self.assertEqual(len(iterated), 4)
+            finally:
+                self.db.connection.rollback()
+
+
+if __name__ == '__main__':
+    unittest.main()
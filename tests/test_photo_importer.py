@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+photo_importer 的EXIF时间解析和批量写入测试
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+try:
+    import photo_importer
+except ImportError:
+    # 模块级依赖 PyQt6、Pillow 和 exifread
+    photo_importer = None
+
+
+@unittest.skipIf(photo_importer is None, "需要PyQt6、Pillow和exifread")
+class PhotoDatetimeFromExifTest(unittest.TestCase):
+    """photo_datetime_from_exif 按 DateTimeOriginal > DateTimeDigitized > DateTime 取时间"""
+    
+    def test_prefers_original(self):
+        exif_data = {
+            'DateTimeOriginal': '2021:01:02 03:04:05',
+            'DateTimeDigitized': '2022:01:02 03:04:05',
+            'DateTime': '2023:01:02 03:04:05',
+        }
+        self.assertEqual(photo_importer.photo_datetime_from_exif(exif_data),
+                         datetime(2021, 1, 2, 3, 4, 5))
+    
+    def test_digitized_before_modify_time(self):
+        exif_data = {
+            'DateTimeDigitized': '2022:01:02 03:04:05',
+            'DateTime': '2023:01:02 03:04:05',
+        }
+        self.assertEqual(photo_importer.photo_datetime_from_exif(exif_data),
+                         datetime(2022, 1, 2, 3, 4, 5))
+    
+    def test_invalid_value_falls_through(self):
+        exif_data = {
+            'DateTimeOriginal': '0000:00:00 00:00:00',
+            'DateTimeDigitized': '2022:01:02 03:04:05\x00',
+        }
+        self.assertEqual(photo_importer.photo_datetime_from_exif(exif_data),
+                         datetime(2022, 1, 2, 3, 4, 5))
+    
+    def test_no_time_tags(self):
+        self.assertIsNone(photo_importer.photo_datetime_from_exif({'Make': 'Canon'}))
+
+
+
+@unittest.skipIf(photo_importer is None, "需要PyQt6、Pillow和exifread")
+class FlushRecordsTest(unittest.TestCase):
+    """批量写入失败时删除已复制到照片库中的文件"""
+    
+    def setUp(self):
+        self.library_dir = tempfile.mkdtemp()
+        self.worker = photo_importer.PhotoImportWorker(
+            [], self.library_dir, os.path.join(self.library_dir, '.library.db')
+        )
+        self.worker._pending_keys = set()
+        self.worker._pending_records = []
+        for i in range(3):
+            final_path = os.path.join(self.library_dir, f'IMG_{i:03d}.jpg')
+            with open(final_path, 'wb') as f:
+                f.write(b'photo')
+            self.worker._pending_records.append(
+                (f'/source/IMG_{i:03d}.jpg', final_path, {'filename': f'IMG_{i:03d}.jpg'})
+            )
+    
+    def tearDown(self):
+        shutil.rmtree(self.library_dir, ignore_errors=True)
+    
+    def test_failed_batch_removes_copied_files(self):
+        db_manager = mock.Mock()
+        db_manager.add_photo_records_with_ids.side_effect = sqlite3.OperationalError('disk I/O error')
+        
+        self.assertEqual(self.worker._flush_records(db_manager), (0, 3))
+        self.assertEqual(os.listdir(self.library_dir), [])
+    
+    def test_duplicate_rows_remove_copied_files(self):
+        db_manager = mock.Mock()
+        db_manager.add_photo_records_with_ids.return_value = [1, None, 3]
+        
+        self.assertEqual(self.worker._flush_records(db_manager), (2, 1))
+        self.assertEqual(sorted(os.listdir(self.library_dir)), ['IMG_000.jpg', 'IMG_002.jpg'])
+
+
+if __name__ == '__main__':
+    unittest.main()
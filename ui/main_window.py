@@ -1394,7 +1394,7 @@ class MainWindow(QMainWindow):
             QApplication.processEvents()
             
             # 获取所有照片记录
-            all_photos = self.dao_manager.photo_dao.get_all_photos()
+            all_photos = self.dao_manager.photo_dao.get_all_photos(include_exif=False)
             total_photos = len(all_photos)
             
             if total_photos == 0:
@@ -1403,7 +1403,7 @@ class MainWindow(QMainWindow):
                 return
             
             progress.setMaximum(total_photos)
-            invalid_count = 0
+            invalid_ids = []
             
             # 检查每张照片的文件是否存在
             for i, photo in enumerate(all_photos):
@@ -1420,9 +1420,12 @@ class MainWindow(QMainWindow):
                 
                 # 检查文件是否存在
                 if not os.path.exists(full_path):
-                    # 文件不存在，标记为删除
-                    self.dao_manager.photo_dao.delete_photo(photo['id'], soft_delete=True)
-                    invalid_count += 1
+                    # 文件不存在，稍后统一标记为删除
+                    invalid_ids.append(photo['id'])
+            
+            # 已检查出的无效记录在一个事务中标记为删除
+            self.dao_manager.photo_dao.delete_photos(invalid_ids, soft_delete=True)
+            invalid_count = len(invalid_ids)
             
             progress.close()
             
@@ -1545,15 +1548,19 @@ class MainWindow(QMainWindow):
         """静默整理数据库（不显示进度和结果）"""
         try:
             # 获取所有照片记录
-            all_photos = self.dao_manager.photo_dao.get_all_photos()
+            all_photos = self.dao_manager.photo_dao.get_all_photos(include_exif=False)
             
             # 检查每张照片的文件是否存在
             photo_library_path = self.config_manager.get_photo_library_path()
+            invalid_ids = []
             for photo in all_photos:
                 full_path = os.path.join(photo_library_path, photo['relative_path'])
                 if not os.path.exists(full_path):
-                    # 文件不存在，标记为删除
-                    self.dao_manager.photo_dao.delete_photo(photo['id'], soft_delete=True)
+                    # 文件不存在，稍后统一标记为删除
+                    invalid_ids.append(photo['id'])
+            
+            # 在一个事务中标记为删除
+            self.dao_manager.photo_dao.delete_photos(invalid_ids, soft_delete=True)
                     
         except Exception as e:
             print(f"静默整理数据库时发生错误: {e}")